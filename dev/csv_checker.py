@@ -1,11 +1,258 @@
+import argparse
+import codecs
 import csv
+import json
+import mmap
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-file_path = "./elt-docker/rest_api/data/app_store/user_reviews.csv"
-with open(file_path, newline='') as f:
-    reader = csv.reader(f)
-    header = next(reader)
-    num_cols = len(header)
-    print(num_cols)
-    for i, row in enumerate(reader, start=2):  # start=2 to count lines correctly
-        if len(row) != num_cols:
-            print(f"Line {i} has {len(row)} columns instead of {num_cols}: {row}")
\ No newline at end of file
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.json as pa_json
+except ImportError:
+    pa_json = None
+
+BLOCK_SIZE = 64 << 20
+MAX_EXAMPLES = 10
+QUOTE, COMMA, CR, LF = ord('"'), ord(','), ord('\r'), ord('\n')
+IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_$]*$')
+
+
+def scan_records(data, quoted):
+    """Field count, start offset and blankness of every record in a mapped file.
+
+    Works a block at a time with numpy: a running quote parity (a uint8 cumsum wraps, but
+    only its lowest bit is used) marks bytes inside quotes, so delimiters and newlines in
+    quoted values are ignored. An escaped quote ("") flips the parity twice.
+    Returns (fields, starts, blank, unterminated_quote) as numpy arrays and a bool.
+    """
+    arr = np.frombuffer(data, dtype=np.uint8)
+    parity = 0
+    pending_delims = 0
+    record_start = 0
+    fields, starts, blank = [], [], []
+    for offset in range(0, len(arr), BLOCK_SIZE):
+        block = arr[offset:offset + BLOCK_SIZE]
+        if quoted:
+            inside = (np.cumsum(block == QUOTE, dtype=np.uint8) + parity) & 1
+            parity = int(inside[-1])
+            outside = inside == 0
+            ends = np.flatnonzero((block == LF) & outside)
+            delims = np.flatnonzero((block == COMMA) & outside)
+        else:
+            ends = np.flatnonzero(block == LF)
+            delims = np.flatnonzero(block == COMMA)
+        if not len(ends):
+            pending_delims += len(delims)
+            continue
+
+        before = np.searchsorted(delims, ends)
+        counts = np.diff(before, prepend=0)
+        counts[0] += pending_delims
+        pending_delims = len(delims) - int(before[-1])
+
+        ends = ends + offset
+        record_starts = np.concatenate(([record_start], ends[:-1] + 1))
+        # A record is blank if nothing but an optional \r precedes its newline
+        lengths = ends - record_starts
+        has_cr = arr[np.maximum(ends - 1, 0)] == CR
+        fields.append(counts + 1)
+        starts.append(record_starts)
+        blank.append((lengths == 0) | ((lengths == 1) & has_cr))
+        record_start = int(ends[-1]) + 1
+
+    if record_start < len(arr):
+        # Last record without a trailing newline
+        fields.append(np.array([pending_delims + 1]))
+        starts.append(np.array([record_start]))
+        blank.append(np.array([len(arr) - record_start == 1 and arr[-1] == CR]))
+    if not fields:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool), bool(parity)
+    return np.concatenate(fields), np.concatenate(starts), np.concatenate(blank), bool(parity)
+
+
+def check_encoding(data):
+    """Invalid UTF-8 sequences in a mapped file: (count, offset of the first one)"""
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    invalid = 0
+    first = None
+    for offset in range(0, len(data), BLOCK_SIZE):
+        raw = data[offset:offset + BLOCK_SIZE]
+        text = decoder.decode(raw, final=offset + BLOCK_SIZE >= len(data))
+        # U+FFFD that was already in the file is valid; only count the ones the decoder added
+        errors = text.count('\ufffd') - raw.count('\ufffd'.encode())
+        if errors > 0:
+            invalid += errors
+            if first is None:
+                try:
+                    raw.decode('utf-8')
+                except UnicodeDecodeError as e:
+                    first = offset + e.start
+    return invalid, first
+
+
+def header_issues(names):
+    """Problems with column names once Snowflake uppercases them"""
+    issues = {}
+    empty = [i for i, name in enumerate(names) if not name.strip()]
+    if empty:
+        issues['empty_names'] = empty
+    padded = [name for name in names if name != name.strip()]
+    if padded:
+        issues['whitespace'] = padded
+    seen = {}
+    for name in names:
+        seen.setdefault(name.strip().upper(), []).append(name)
+    collisions = [group for group in seen.values() if len(group) > 1]
+    if collisions:
+        issues['case_collisions'] = collisions
+    quoted = [name for name in names if name.strip() and not IDENTIFIER.match(name.strip())]
+    if quoted:
+        issues['needs_quoting'] = quoted
+    return issues
+
+
+def check_jsonl(file_path):
+    """Parse errors and top-level keys of a JSONL file, streamed through pyarrow when available"""
+    if pa_json is not None:
+        try:
+            if hasattr(pa_json, 'open_json'):
+                reader = pa_json.open_json(file_path)
+                names = reader.schema.names
+                for _ in reader:
+                    pass
+            else:
+                names = pa_json.read_json(file_path).schema.names
+            return None, names
+        except pyarrow.ArrowInvalid as e:
+            return str(e).splitlines()[0], None
+    names = {}
+    with open(file_path, 'rb') as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                names.update(dict.fromkeys(json.loads(line)))
+            except ValueError as e:
+                return f"line {line_no}: {e}", None
+    return None, list(names)
+
+
+def validate_file(task):
+    """Validate one CSV/JSONL source file; returns its report entry"""
+    db, table, file_path = task
+    started = time.monotonic()
+    quoted = file_path.endswith('.csv')
+    result = {'database': db, 'table': table, 'path': file_path, 'bytes': os.path.getsize(file_path), 'issues': {}}
+    issues = result['issues']
+
+    with open(file_path, 'rb') as f:
+        if result['bytes'] == 0:
+            issues['empty_file'] = True
+            result['rows'] = 0
+            return result
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            fields, starts, blank, unterminated = scan_records(data, quoted)
+            invalid, first_invalid = check_encoding(data)
+            if invalid:
+                issues['encoding_errors'] = {'count': invalid, 'first_offset': first_invalid}
+            if unterminated:
+                issues['unterminated_quote'] = True
+            if data[:3] == codecs.BOM_UTF8:
+                issues['bom'] = True
+
+            non_blank = ~blank
+            if blank.any():
+                issues['blank_lines'] = int(blank.sum())
+            if quoted and len(fields):
+                header_end = starts[1] if len(starts) > 1 else len(data)
+                header = data[:header_end].decode('utf-8-sig', errors='replace')
+                names = next(csv.reader([header.rstrip('\r\n')]), [])
+                result['columns'] = len(names)
+                issues.update(header_issues(names))
+
+                ragged = np.flatnonzero((fields != fields[0]) & non_blank)
+                if len(ragged):
+                    issues['ragged_rows'] = {
+                        'count': len(ragged),
+                        'examples': [{'record': int(i), 'offset': int(starts[i]), 'fields': int(fields[i])}
+                                     for i in ragged[:MAX_EXAMPLES]],
+                    }
+                result['rows'] = max(int(non_blank.sum()) - 1, 0)
+            else:
+                result['rows'] = int(non_blank.sum())
+
+    if not quoted:
+        parse_error, names = check_jsonl(file_path)
+        if parse_error:
+            issues['json_error'] = parse_error
+        else:
+            result['columns'] = len(names)
+            issues.update(header_issues(names))
+    result['seconds'] = time.monotonic() - started
+    return result
+
+
+def list_files(source_dir):
+    """(db, table, path) for every CSV/JSONL file below `source_dir`, largest first to balance the pool"""
+    tasks = []
+    for dir_path, _, file_names in os.walk(source_dir):
+        for file_name in file_names:
+            if file_name.endswith(('.csv', '.jsonl')):
+                path = os.path.join(dir_path, file_name)
+                tasks.append((os.path.basename(dir_path), file_name.split('.')[0], path))
+    return sorted(tasks, key=lambda task: os.path.getsize(task[2]), reverse=True)
+
+
+def compare_counts(result, table_counts):
+    """Check a file's row count against table.json, whose table names are matched case-insensitively"""
+    expected = table_counts.get(result['database'], {})
+    keys = {key.upper(): key for key in expected}
+    key = keys.get(result['table'].upper())
+    if key is None:
+        result['issues']['not_in_table_json'] = True
+        return
+    result['expected_rows'] = expected[key]
+    if key != result['table']:
+        result['issues']['table_case'] = {'file': result['table'], 'table_json': key}
+    if result.get('rows') is not None and result['rows'] != expected[key]:
+        result['issues']['row_count'] = {'expected': expected[key], 'found': result['rows']}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate all CSV/JSONL source files before loading")
+    parser.add_argument("--source", type=str, default="./data/source", help="Directory scanned recursively for <db>/<table>.csv|jsonl")
+    parser.add_argument("--table_json", type=str, default="./evaluation/table.json", help="Expected row counts")
+    parser.add_argument("--report", type=str, default="./data/source_validation.json", help="Where the JSON report is written")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(), help="Number of worker processes")
+    args = parser.parse_args()
+
+    with open(args.table_json, 'r') as f:
+        table_counts = json.load(f)
+
+    started = time.monotonic()
+    tasks = list_files(args.source)
+    with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+        results = list(pool.map(validate_file, tasks))
+    for result in results:
+        compare_counts(result, table_counts)
+    elapsed = time.monotonic() - started
+
+    results.sort(key=lambda r: (r['database'], r['table']))
+    # Informational only: a table.json without the file, or names the loader quotes anyway
+    blocking = [r for r in results if set(r['issues']) - {'not_in_table_json', 'needs_quoting', 'table_case'}]
+    for r in results:
+        if r['issues']:
+            print(f"{r['database']}.{r['table']}: {json.dumps(r['issues'])}", flush=True)
+    print(f"Checked {len(results)} files ({sum(r['bytes'] for r in results) / 1e6:.0f} MB) in {elapsed:.1f}s; "
+          f"{len(blocking)} with problems", flush=True)
+
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, 'w') as f:
+        json.dump({'seconds': elapsed, 'files': results}, f, indent=2)
+    sys.exit(1 if blocking else 0)
@@ -0,0 +1,287 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import random
+import re
+import signal
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Served when neither --script nor --replay is given: one shell command, one SQL query,
+# then Terminate, so every trajectory exercises container exec and a Snowflake action
+DEFAULT_SCRIPT = [
+    {"content": 'Thought: Look at the workspace first.\nAction: Bash(code="ls -la")'},
+    {"content": 'Thought: Check the Snowflake connection.\nAction: SNOWFLAKE_EXEC_SQL(sql_query="SELECT CURRENT_DATABASE()", is_save=False)'},
+    {"content": 'Thought: Done.\nAction: Terminate(output="done")'},
+]
+
+
+def message_text(message):
+    """Text of a chat message whose content is a string or a list of parts"""
+    content = message.get("content") or ""
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+
+
+def estimate_tokens(text):
+    return max(1, len(text) // 4)
+
+
+def read_script(path):
+    """Entries of a JSONL script: {"content", optional "match" regex, "latency", "completion_tokens"}"""
+    entries = []
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                if entry.get("match"):
+                    entry["pattern"] = re.compile(entry["match"], re.S)
+                entries.append(entry)
+    return entries
+
+
+def read_recordings(pattern):
+    """{task instruction: [responses]} from spider result.json files, e.g. output/*/spider/result.json"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "**", "result.json")
+    recordings = {}
+    for path in sorted(glob.glob(pattern, recursive=True)):
+        with open(path, 'r') as f:
+            result = json.load(f)
+        responses = [step["response"] for step in result.get("trajectory", []) if step.get("response")]
+        if result.get("Task") and responses:
+            recordings[result["Task"]] = responses
+    return recordings
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    # Set before listen(): a burst of agents connecting at once must not overflow the backlog
+    request_queue_size = 1024
+    daemon_threads = True
+
+
+class MockLLM:
+    """Picks the completion for a request and keeps per-conversation turn counters.
+
+    A conversation is identified by the X-Conversation-Id header, else the request's
+    "user" field, else its first message (spider's system prompt includes the task). Its
+    turn is the number of requests seen for it so far; a request without assistant messages
+    starts it over, so rerunning a task replays from the first entry. Agents trim their
+    history, so the number of assistant messages in a request is not a usable turn.
+    Rules (script entries with "match") are checked against the last message first; the
+    other entries are served in order per conversation, repeating the last one when exhausted.
+    """
+
+    def __init__(self, entries, recordings, options):
+        self.rules = [e for e in entries if e.get("pattern")]
+        self.sequence = [e for e in entries if not e.get("pattern")]
+        self.recordings = recordings
+        self.options = options
+        self.turns = {}
+        self.conversations = 0
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "prompt_tokens": 0, "completion_tokens": 0, "latency": 0.0}
+
+    def next_turn(self, key, new):
+        with self.lock:
+            if new or key not in self.turns:
+                self.conversations += 1
+                self.turns[key] = 0
+            turn = self.turns[key]
+            self.turns[key] = turn + 1
+            return turn
+
+    def reset(self, key=None):
+        """Forget one conversation's turn counter, or all of them; returns how many were dropped"""
+        with self.lock:
+            if key is None:
+                dropped = len(self.turns)
+                self.turns.clear()
+                return dropped
+            return 1 if self.turns.pop(key, None) is not None else 0
+
+    def recorded(self, first_text):
+        for task, responses in self.recordings.items():
+            if task in first_text:
+                return responses
+        return None
+
+    @staticmethod
+    def conversation(payload, conversation_id=None):
+        if conversation_id or payload.get("user"):
+            return str(conversation_id or payload["user"])
+        messages = payload.get("messages") or [{"content": ""}]
+        return hashlib.sha1(message_text(messages[0]).encode()).hexdigest()[:16]
+
+    def complete(self, payload, key):
+        """(entry, turn) for a chat completion request of conversation `key`"""
+        messages = payload.get("messages") or [{"content": ""}]
+        first_text = message_text(messages[0])
+        new = not any(m.get("role") == "assistant" for m in messages)
+        turn = self.next_turn(key, new)
+        last_text = message_text(messages[-1])
+        for rule in self.rules:
+            if rule["pattern"].search(last_text):
+                return rule, turn
+        responses = self.recorded(first_text) if self.recordings else None
+        if responses:
+            return {"content": responses[min(turn, len(responses) - 1)]}, turn
+        sequence = self.sequence or DEFAULT_SCRIPT
+        return sequence[min(turn, len(sequence) - 1)], turn
+
+    def latency(self, entry, completion_tokens):
+        if "latency" in entry:
+            return float(entry["latency"])
+        seconds = self.options.latency + random.uniform(-self.options.jitter, self.options.jitter)
+        if self.options.tokens_per_second:
+            seconds += completion_tokens / self.options.tokens_per_second
+        return max(0.0, seconds)
+
+    def record(self, **fields):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["errors"] += fields.get("error", 0)
+            self.stats["prompt_tokens"] += fields.get("prompt_tokens", 0)
+            self.stats["completion_tokens"] += fields.get("completion_tokens", 0)
+            self.stats["latency"] += fields.get("latency", 0.0)
+            if self.options.log:
+                with open(self.options.log, 'a') as f:
+                    f.write(json.dumps(fields) + "\n")
+
+
+def completion_body(payload, content, prompt_tokens, completion_tokens):
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "mock"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        },
+    }
+
+
+def stop(signum, frame):
+    raise KeyboardInterrupt
+
+
+def make_handler(llm):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def send_json(self, status, body):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/v1/models":
+                self.send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "mock"}]})
+            elif self.path.rstrip("/") == "/health":
+                self.send_json(200, {"status": "ok", **llm.stats})
+            else:
+                self.send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error", "code": "not_found"}})
+
+        def do_POST(self):
+            path = self.path.rstrip("/")
+            if path not in ("/v1/chat/completions", "/chat/completions", "/reset"):
+                self.send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error", "code": "not_found"}})
+                return
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if path == "/reset":
+                conversation_id = self.headers.get("X-Conversation-Id") or payload.get("conversation")
+                self.send_json(200, {"reset": llm.reset(conversation_id)})
+                return
+            key = llm.conversation(payload, self.headers.get("X-Conversation-Id"))
+            # A failed request does not use up a turn, so the agent's retry gets the same completion
+            if random.random() < llm.options.error_rate:
+                seconds = self.latency_for({}, 0)
+                llm.record(conversation=key, error=1, latency=seconds)
+                self.send_json(429, {"error": {"message": "Mock rate limit", "type": "requests", "code": "rate_limit_exceeded"}})
+                return
+            entry, turn = llm.complete(payload, key)
+            prompt_tokens = llm.options.prompt_tokens or sum(estimate_tokens(message_text(m)) for m in payload.get("messages", []))
+            completion_tokens = int(entry.get("completion_tokens") or llm.options.completion_tokens or estimate_tokens(entry["content"]))
+            seconds = self.latency_for(entry, completion_tokens)
+            llm.record(conversation=key, turn=turn, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, latency=seconds)
+            body = completion_body(payload, entry["content"], prompt_tokens, completion_tokens)
+            if payload.get("stream"):
+                self.send_stream(body)
+            else:
+                self.send_json(200, body)
+
+        def latency_for(self, entry, completion_tokens):
+            seconds = llm.latency(entry, completion_tokens)
+            time.sleep(seconds)
+            return seconds
+
+        def send_stream(self, body):
+            """The completion as a single server-sent event chunk, for clients that set stream=true"""
+            choice = body["choices"][0]
+            chunk = {**body, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": choice["message"], "finish_reason": "stop"}]}
+            data = f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI-compatible mock LLM serving scripted or recorded completions, for load-testing agent harnesses")
+    parser.add_argument("--host", type=str, default="127.0.0.1", help="Interface to listen on (0.0.0.0 to serve agent containers)")
+    parser.add_argument("--port", type=int, default=8100, help="Port; spider's self-hosted models call localhost:8100")
+    parser.add_argument("--script", type=str, default=None, help="JSONL of {content, match?, latency?, completion_tokens?} entries")
+    parser.add_argument("--replay", type=str, default=None, help="Spider result.json files (directory or glob) whose responses are replayed per task")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- seconds added to --latency")
+    parser.add_argument("--tokens_per_second", type=float, default=0.0, help="Also wait completion_tokens / N seconds, like a decoding model (0 to disable)")
+    parser.add_argument("--prompt_tokens", type=int, default=0, help="Fixed prompt token count to report (default: about 4 characters per token)")
+    parser.add_argument("--completion_tokens", type=int, default=0, help="Fixed completion token count to report (default: about 4 characters per token)")
+    parser.add_argument("--error_rate", type=float, default=0.0, help="Fraction of requests answered with a 429 rate_limit_exceeded error")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for jitter and errors")
+    parser.add_argument("--log", type=str, default=None, help="Append one JSON line per request (conversation, turn, tokens, latency)")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    entries = read_script(args.script) if args.script else []
+    recordings = read_recordings(args.replay) if args.replay else {}
+    if args.replay:
+        print(f"Replaying {len(recordings)} recorded trajectories", flush=True)
+    llm = MockLLM(entries, recordings, args)
+
+    server = MockLLMServer((args.host, args.port), make_handler(llm))
+    print(f"Mock LLM listening on http://{args.host}:{args.port}/v1/chat/completions", flush=True)
+    # Print the summary when stopped by kill as well as by Ctrl-C
+    signal.signal(signal.SIGTERM, stop)
+    started = time.monotonic()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        elapsed = time.monotonic() - started
+        stats = llm.stats
+        served = stats["requests"] - stats["errors"]
+        print(f"\nServed {stats['requests']} requests ({stats['errors']} errors) to {llm.conversations} conversations in {elapsed:.1f}s; "
+              f"{stats['requests'] / max(elapsed, 1e-9):.1f} req/s, mean latency {stats['latency'] / max(stats['requests'], 1):.3f}s, "
+              f"{stats['prompt_tokens']} prompt / {stats['completion_tokens']} completion tokens over {served} completions", flush=True)
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+CHUNK_SIZE = 1 << 20
+
+
+class DownloadCache:
+    """Content-addressed cache of downloaded files.
+
+    objects/<sha256> holds each distinct payload once; keys/<key>.json maps a download key
+    (URL plus the server's ETag, Last-Modified, Content-Length and Content-Disposition) to the
+    object. URLs whose server sends none of ETag, Last-Modified or an attachment filename with
+    its length are downloaded every time. Every key is its own
+    file, written atomically, so concurrent loader processes can share one cache.
+    Any http(s) URL works, including a local http.server standing in for the real host.
+    """
+
+    def __init__(self, cache_dir, session=None):
+        self.cache_dir = cache_dir
+        self.session = session or requests.Session()
+        os.makedirs(os.path.join(cache_dir, "objects"), exist_ok=True)
+        os.makedirs(os.path.join(cache_dir, "keys"), exist_ok=True)
+
+    def download_key(self, url):
+        """Key identifying the current version of `url`; None if the server sends nothing that tells versions apart.
+
+        Google Drive's uc?export=download links, which every flat_files source uses, send no
+        ETag or Last-Modified; for those the attachment's filename and Content-Length stand in,
+        so only a change that keeps the file's name and exact size is missed.
+        """
+        try:
+            response = self.session.head(url, allow_redirects=True, timeout=30)
+        except requests.RequestException:
+            return None
+        if not response.ok:
+            return None
+        etag = response.headers.get("ETag", "")
+        modified = response.headers.get("Last-Modified", "")
+        size = response.headers.get("Content-Length", "")
+        disposition = response.headers.get("Content-Disposition", "")
+        if not etag and not modified and not (size and disposition):
+            # The URL alone would serve a changed file from the cache forever
+            return None
+        return hashlib.sha256(f"{url}\n{etag}\n{modified}\n{size}\n{disposition}".encode()).hexdigest()
+
+    def object_path(self, sha256):
+        return os.path.join(self.cache_dir, "objects", sha256)
+
+    def lookup(self, key):
+        key_path = os.path.join(self.cache_dir, "keys", f"{key}.json")
+        if not os.path.exists(key_path):
+            return None
+        with open(key_path, 'r') as f:
+            entry = json.load(f)
+        return entry if os.path.exists(self.object_path(entry["sha256"])) else None
+
+    def store(self, key, entry):
+        key_path = os.path.join(self.cache_dir, "keys", f"{key}.json")
+        with open(f"{key_path}.tmp", 'w') as f:
+            json.dump(entry, f)
+        os.replace(f"{key_path}.tmp", key_path)
+
+    def fetch(self, url):
+        """Return (object path, cache hit) for `url`, downloading it only if not cached"""
+        key = self.download_key(url)
+        entry = self.lookup(key) if key else None
+        if entry:
+            return self.object_path(entry["sha256"]), True
+
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.join(self.cache_dir, "objects"))
+        try:
+            with os.fdopen(fd, 'wb') as f, self.session.get(url, stream=True, timeout=60) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    digest.update(chunk)
+                    f.write(chunk)
+            sha256 = digest.hexdigest()
+            os.replace(tmp_path, self.object_path(sha256))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if key:
+            self.store(key, {"url": url, "sha256": sha256, "size": os.path.getsize(self.object_path(sha256))})
+        return self.object_path(sha256), False
+
+    def fetch_all(self, urls, workers=8):
+        """fetch() every URL concurrently; results in the order of `urls`"""
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.fetch, urls))
+
+
+def link_file(source, target):
+    """Hard-link `source` to `target` (copying across filesystems), replacing any existing file"""
+    if os.path.lexists(target):
+        os.remove(target)
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
@@ -0,0 +1,90 @@
+import gzip
+import os
+import shutil
+from pathlib import Path
+
+PARTS_SUFFIX = ".parts"
+COMPLETE_MARKER = ".complete"
+
+
+def parts_dir(file_path, chunk_root):
+    """Directory holding the chunks of a source file: <chunk_root>/<table>.<ext>.parts"""
+    return Path(chunk_root) / f"{file_path.name}{PARTS_SUFFIX}"
+
+
+def records(f, quoted):
+    """Yield complete records (raw bytes, newline included) from a binary file.
+
+    For CSV a newline inside a double-quoted value does not end the record; with
+    ESCAPE = NONE an escaped quote is written as "", which keeps the quote count even.
+    """
+    pending = []
+    open_quotes = 0
+    for line in f:
+        if quoted:
+            open_quotes += line.count(b'"')
+            if open_quotes % 2:
+                pending.append(line)
+                continue
+            open_quotes = 0
+        if pending:
+            pending.append(line)
+            yield b"".join(pending)
+            pending = []
+        else:
+            yield line
+    if pending:
+        yield b"".join(pending)
+
+
+def split_file(file_path, chunk_root, chunk_bytes):
+    """Split a CSV/JSONL file into gzip chunks of about `chunk_bytes` compressed bytes each.
+
+    Every CSV chunk starts with the original header. Chunks are only rewritten when the
+    source or the chunk size changed since the last split. Returns the parts directory.
+    """
+    out_dir = parts_dir(file_path, chunk_root)
+    stat = file_path.stat()
+    signature = f"{stat.st_size} {stat.st_mtime} {chunk_bytes}"
+    marker = out_dir / COMPLETE_MARKER
+    if marker.exists() and marker.read_text() == signature:
+        return out_dir
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    out_dir.mkdir(parents=True)
+
+    table, ext = file_path.name.split(".")[:2]
+    quoted = ext == "csv"
+    index = 0
+    raw = chunk = None
+    with open(file_path, 'rb') as f:
+        header = f.readline() if quoted else b""
+        for record in records(f, quoted):
+            if chunk is None:
+                raw = open(out_dir / f"{table}_{index:05d}.{ext}.gz", 'wb')
+                chunk = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=1)
+                chunk.write(header)
+                index += 1
+            chunk.write(record)
+            # raw.tell() lags the compressor by its internal buffer, which is negligible at this size
+            if raw.tell() >= chunk_bytes:
+                chunk.close()
+                raw.close()
+                chunk = None
+    if chunk is not None:
+        chunk.close()
+        raw.close()
+    marker.write_text(signature)
+    return out_dir
+
+
+def split_large_files(files, chunk_root, threshold_bytes, chunk_bytes):
+    """{file or parts directory to upload: source file}, splitting CSV/JSONL files over the threshold"""
+    os.makedirs(chunk_root, exist_ok=True)
+    uploads = {}
+    for file_path in files:
+        if file_path.suffix in (".csv", ".jsonl") and file_path.stat().st_size > threshold_bytes:
+            uploads[split_file(file_path, chunk_root, chunk_bytes)] = file_path
+        else:
+            uploads[file_path] = file_path
+    return uploads
@@ -0,0 +1,36 @@
+GOLDEN_SUFFIX = "_GOLDEN"
+
+
+class DatabaseResetter:
+    """Keep a pristine golden copy of each benchmark database and reset working copies from it.
+
+    Both directions are zero-copy `CREATE OR REPLACE DATABASE ... CLONE`, so a reset takes
+    seconds however large the database is. All SQL goes through `execute(sql) -> rows`,
+    which lets a local stand-in (or a recorder) replace the Snowflake connection.
+    """
+
+    def __init__(self, execute, suffix=GOLDEN_SUFFIX):
+        self.execute = execute
+        self.suffix = suffix
+
+    @classmethod
+    def for_connection(cls, conn, suffix=GOLDEN_SUFFIX):
+        return cls(lambda sql: conn.cursor().execute(sql).fetchall(), suffix)
+
+    def golden_name(self, db_name):
+        return f"{db_name}{self.suffix}".upper()
+
+    def has_golden(self, db_name):
+        # LIKE treats "_" as a wildcard, so the pattern also matches e.g. MOVIE_3XGOLDEN; compare the name column exactly
+        golden = self.golden_name(db_name)
+        return any(row[1].upper() == golden for row in self.execute(f"SHOW DATABASES LIKE '{golden}'"))
+
+    def promote(self, db_name):
+        """Snapshot a freshly loaded database as its golden copy"""
+        self.execute(f"CREATE OR REPLACE DATABASE {self.golden_name(db_name)} CLONE {db_name}")
+
+    def reset(self, db_name):
+        """Replace the working database, including anything an agent wrote to it, with a clone of the golden copy"""
+        if not self.has_golden(db_name):
+            raise RuntimeError(f"No golden copy {self.golden_name(db_name)}; load {db_name} with --golden first")
+        self.execute(f"CREATE OR REPLACE DATABASE {db_name} CLONE {self.golden_name(db_name)}")
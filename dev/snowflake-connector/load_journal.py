@@ -0,0 +1,58 @@
+import json
+import os
+
+
+class LoadJournal:
+    """Append-only checkpoint journal of a loader run.
+
+    One JSON line per finished table ({database, table, rows_loaded}) and per finished
+    database ({database, done}). Lines are flushed and fsynced as they are written, so
+    after a crash the journal tells exactly which tables are in Snowflake. Short appends
+    are atomic, which lets the --jobs worker processes share the file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def reset(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        open(self.path, 'w').close()
+
+    def repair(self):
+        """Cut a line torn by a crash, so that new records do not get appended to it"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb+') as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    def append(self, record):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def table_done(self, db_name, table, rows_loaded):
+        self.append({"database": db_name, "table": table.upper(), "rows_loaded": rows_loaded})
+
+    def database_done(self, db_name):
+        self.append({"database": db_name, "done": True})
+
+    def read(self):
+        """({database: {TABLE: rows loaded}}, {finished databases}); a torn last line is ignored"""
+        tables, done = {}, set()
+        if not os.path.exists(self.path):
+            return tables, done
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get("done"):
+                    done.add(record["database"])
+                else:
+                    tables.setdefault(record["database"], {})[record["table"]] = record["rows_loaded"]
+        return tables, done
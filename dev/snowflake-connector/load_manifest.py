@@ -0,0 +1,48 @@
+import hashlib
+import json
+import os
+
+CHUNK_SIZE = 1 << 20
+
+
+def read_manifest(manifest_path):
+    """{file path: {size, mtime, sha256, database, table, rows_loaded}}, empty if not written yet"""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+
+def write_manifest(manifest_path, manifest):
+    # Write-then-rename so an interrupted run never leaves a truncated manifest behind
+    os.makedirs(os.path.dirname(manifest_path) or ".", exist_ok=True)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def describe_file(file_path, previous=None):
+    """Size, mtime and sha256 of a file; the hash is reused when size and mtime are unchanged"""
+    stat = os.stat(file_path)
+    if previous and previous.get("size") == stat.st_size and previous.get("mtime") == stat.st_mtime:
+        sha256 = previous["sha256"]
+    else:
+        sha256 = file_sha256(file_path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime, "sha256": sha256}
+
+
+def is_unchanged(current, previous):
+    """True when a file has the same content as when it was last loaded successfully"""
+    return bool(previous) and previous.get("sha256") == current["sha256"] and previous.get("rows_loaded") is not None
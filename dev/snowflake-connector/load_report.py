@@ -0,0 +1,105 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+PHASES = ("put", "infer", "create", "copy", "remove")
+
+
+class LoadReport:
+    """Per-file phase timings, bytes and rows for one database load.
+
+    Phases run once per database (the single PUT/REMOVE of --staged) are recorded
+    under the database itself rather than split across files.
+    """
+
+    def __init__(self, db_name):
+        self.db_name = db_name
+        self.phases = {}
+        self.files = {}
+        self.verification = None
+
+    def file(self, file_name):
+        return self.files.setdefault(file_name, {"phases": {}, "source_bytes": 0, "staged_bytes": 0, "rows_loaded": None, "errors_seen": None})
+
+    @contextmanager
+    def phase(self, phase, file_name=None):
+        phases = self.file(file_name)["phases"] if file_name else self.phases
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            phases[phase] = phases.get(phase, 0.0) + time.monotonic() - started
+
+    def record(self, file_name, **fields):
+        self.file(file_name).update(fields)
+
+    def record_put(self, put_rows, file_name=None):
+        """Bytes per file from a PUT result set (source_size before, target_size after compression).
+
+        With `file_name`, all rows are chunks of that one file and are added up.
+        """
+        if file_name:
+            self.record(file_name,
+                        source_bytes=sum(row["source_size"] for row in put_rows),
+                        staged_bytes=sum(row["target_size"] for row in put_rows))
+            return
+        for row in put_rows:
+            self.record(row["source"], source_bytes=row["source_size"], staged_bytes=row["target_size"])
+
+    def totals(self):
+        phases = {phase: self.phases.get(phase, 0.0) for phase in PHASES}
+        for stats in self.files.values():
+            for phase, seconds in stats["phases"].items():
+                phases[phase] += seconds
+        staged_bytes = sum(stats["staged_bytes"] for stats in self.files.values())
+        rows = sum(stats["rows_loaded"] or 0 for stats in self.files.values())
+        return {
+            "files": len(self.files),
+            "source_bytes": sum(stats["source_bytes"] for stats in self.files.values()),
+            "staged_bytes": staged_bytes,
+            "rows_loaded": rows,
+            "shared_hits": sum(1 for stats in self.files.values() if stats.get("shared_hit")),
+            "phases": phases,
+            "upload_mb_per_s": staged_bytes / 1e6 / phases["put"] if phases["put"] else None,
+        }
+
+    def to_dict(self):
+        files = {}
+        for file_name, stats in self.files.items():
+            files[file_name] = dict(stats)
+            put = stats["phases"].get("put")
+            files[file_name]["upload_mb_per_s"] = stats["staged_bytes"] / 1e6 / put if put else None
+        return {"database": self.db_name, "phases": self.phases, "files": files, "totals": self.totals(),
+                "verification": self.verification}
+
+
+def write_report(report_dir, results, elapsed):
+    """Write the run's load report as JSON; returns its path"""
+    os.makedirs(report_dir, exist_ok=True)
+    path = os.path.join(report_dir, f"load_report_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    run = {
+        "seconds": elapsed,
+        "databases": {r["database"]: {"seconds": r["seconds"], "error": r["error"], **(r["report"] or {})} for r in results},
+    }
+    with open(path, 'w') as f:
+        json.dump(run, f, indent=2, default=str)
+    return path
+
+
+def summary_table(results):
+    """Lines of a per-database table (slowest first): status, size, rows, seconds per phase, MB/s"""
+    header = f"  {'database':<32} {'status':<8} {'MB':>9} {'rows':>12} " + " ".join(f"{p:>8}" for p in PHASES) + f" {'total':>8} {'MB/s':>7}"
+    lines = [header]
+    for r in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        totals = (r["report"] or {}).get("totals")
+        status = "FAILED" if r["error"] else "ok"
+        if not totals:
+            lines.append(f"  {r['database']:<32} {status:<8} {'':>9} {'':>12} " + " ".join(f"{'':>8}" for _ in PHASES) + f" {r['seconds']:>8.1f}")
+            continue
+        rate = f"{totals['upload_mb_per_s']:>7.1f}" if totals["upload_mb_per_s"] else f"{'':>7}"
+        lines.append(
+            f"  {r['database']:<32} {status:<8} {totals['staged_bytes'] / 1e6:>9.1f} {totals['rows_loaded']:>12,} "
+            + " ".join(f"{totals['phases'][p]:>8.1f}" for p in PHASES)
+            + f" {r['seconds']:>8.1f} {rate}")
+    return lines
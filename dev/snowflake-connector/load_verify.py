@@ -0,0 +1,44 @@
+import json
+
+
+def expected_counts(table_json, db_name):
+    """{TABLE: expected rows} for one database from evaluation/table.json (tables matched case-insensitively)"""
+    with open(table_json, 'r') as f:
+        tables = json.load(f)
+    return {table.upper(): count for table, count in tables.get(db_name, {}).items()}
+
+
+def verify_load(entries, report, expected):
+    """Check every loaded table against its expected row count using only the COPY results.
+
+    `entries` are the database's manifest entries (rows_loaded is carried over for tables an
+    incremental load skipped), `report` the LoadReport holding errors_seen per COPY. Tables
+    missing from table.json are reported as "unknown" rather than failed.
+    """
+    errors = {}
+    for stats in report.files.values():
+        if stats.get("table"):
+            table = stats["table"].upper()
+            errors[table] = errors.get(table, 0) + (stats.get("errors_seen") or 0)
+
+    checks = {}
+    for entry in entries.values():
+        table = entry["table"].upper()
+        loaded = entry["rows_loaded"]
+        want = expected.get(table)
+        if loaded is None:
+            status = "not_loaded"
+        elif errors.get(table):
+            status = "errors"
+        elif want is None:
+            status = "unknown"
+        elif loaded != want:
+            status = "mismatch"
+        else:
+            status = "ok"
+        checks[table] = {"expected": want, "rows_loaded": loaded, "errors_seen": errors.get(table, 0), "status": status}
+    return checks
+
+
+def failed_checks(checks):
+    return {table: check for table, check in checks.items() if check["status"] not in ("ok", "unknown")}
@@ -0,0 +1,112 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.json as pa_json
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pa_csv = pa_json = pq = None
+
+
+# Mirrors the CSV_TYPE file format the loader creates in Snowflake
+CSV_PARSE_OPTIONS = dict(delimiter=',', quote_char='"', escape_char=False, newlines_in_values=True)
+# Snowflake loads an empty unquoted field as NULL (EMPTY_FIELD_AS_NULL) and "" as an empty string
+CSV_CONVERT_OPTIONS = dict(strings_can_be_null=True, null_values=[''], quoted_strings_can_be_null=False)
+# Sources are streamed in blocks of this size; column types are inferred from the first block
+BLOCK_BYTES = 16 << 20
+# Conversions run at once by default: each holds a few blocks in memory, not its whole source
+CONVERT_WORKERS = min(4, os.cpu_count() or 1)
+CONVERSION_ERROR = re.compile(r"In CSV column #(\d+): .*CSV conversion error to \w+: invalid value '(.*)'", re.S)
+
+
+def read_csv(source):
+    """Read a CSV file or buffer the way Snowflake parses CSV_TYPE"""
+    return pa_csv.read_csv(source, parse_options=pa_csv.ParseOptions(**CSV_PARSE_OPTIONS),
+                           convert_options=pa_csv.ConvertOptions(**CSV_CONVERT_OPTIONS))
+
+
+def open_csv(source, column_types=None):
+    """Stream a CSV file or buffer in record batches, parsed the way Snowflake parses CSV_TYPE"""
+    return pa_csv.open_csv(source, read_options=pa_csv.ReadOptions(block_size=BLOCK_BYTES),
+                           parse_options=pa_csv.ParseOptions(**CSV_PARSE_OPTIONS),
+                           convert_options=pa_csv.ConvertOptions(column_types=column_types or {}, **CSV_CONVERT_OPTIONS))
+
+
+def widened_type(value):
+    """Type for a column whose inferred type rejected `value`: FLOAT for a number, else TEXT"""
+    try:
+        float(value)
+        return pa.float64()
+    except ValueError:
+        return pa.string()
+
+
+def write_batches(reader, tmp_target):
+    with pq.ParquetWriter(tmp_target, reader.schema, compression="snappy") as writer:
+        for batch in reader:
+            writer.write_batch(batch)
+
+
+def write_csv_parquet(file_path, tmp_target):
+    """Convert a CSV batch by batch. A later block that does not fit the types inferred from
+    the first one restarts the conversion with that column widened."""
+    column_types = {}
+    while True:
+        reader = open_csv(file_path, column_types)
+        try:
+            write_batches(reader, tmp_target)
+            return
+        except pa.ArrowInvalid as e:
+            match = CONVERSION_ERROR.search(str(e))
+            if not match:
+                raise
+            name = reader.schema.field(int(match.group(1))).name
+            column_types[name] = widened_type(match.group(2))
+            if column_types[name] == reader.schema.field(name).type:
+                column_types[name] = pa.string()
+        finally:
+            reader.close()
+
+
+def write_parquet(file_path, tmp_target):
+    """Stream a CSV/JSONL source file into a Snappy-compressed Parquet file"""
+    if file_path.suffix == ".csv":
+        write_csv_parquet(file_path, tmp_target)
+    elif file_path.suffix == ".jsonl":
+        try:
+            write_batches(pa_json.open_json(file_path, read_options=pa_json.ReadOptions(block_size=BLOCK_BYTES)), tmp_target)
+        except pa.ArrowInvalid:
+            # a field changed type after the first block; only a read of the whole file can type it
+            pq.write_table(pa_json.read_json(file_path), tmp_target, compression="snappy")
+    else:
+        raise ValueError(f"Cannot convert {file_path} to Parquet")
+
+
+def convert_file(file_path, parquet_dir):
+    """Write <parquet_dir>/<table>.parquet unless an up-to-date conversion already exists"""
+    target = Path(parquet_dir) / f"{file_path.name.split('.')[0]}.parquet"
+    if target.exists() and target.stat().st_mtime >= file_path.stat().st_mtime:
+        return target
+    tmp_target = target.with_suffix(".parquet.tmp")
+    write_parquet(file_path, tmp_target)
+    os.replace(tmp_target, target)
+    return target
+
+
+def convert_files(files, parquet_dir, workers=CONVERT_WORKERS):
+    """Convert source files to Parquet in parallel; returns {parquet path: source path}.
+
+    Files that are already Parquet are passed through. Arrow releases the GIL while
+    parsing and encoding, so threads are enough; memory grows with `workers`, not file size.
+    """
+    if pq is None:
+        raise RuntimeError("pyarrow is not installed; it is required for --parquet")
+    os.makedirs(parquet_dir, exist_ok=True)
+    to_convert = [f for f in files if f.suffix != ".parquet"]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        converted = dict(zip(to_convert, pool.map(lambda f: convert_file(f, parquet_dir), to_convert)))
+    return {converted.get(f, f): f for f in files}
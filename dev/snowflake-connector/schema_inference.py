@@ -0,0 +1,77 @@
+try:
+    import pyarrow as pa
+    import pyarrow.json as pa_json
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pa_json = pq = None
+
+from parquet_convert import read_csv
+
+
+def snowflake_type(arrow_type):
+    """Map an Arrow type to the Snowflake type INFER_SCHEMA would pick for it"""
+    if pa.types.is_boolean(arrow_type):
+        return "BOOLEAN"
+    if pa.types.is_integer(arrow_type):
+        return "NUMBER(38, 0)"
+    if pa.types.is_floating(arrow_type):
+        return "FLOAT"
+    if pa.types.is_decimal(arrow_type):
+        return f"NUMBER({arrow_type.precision}, {arrow_type.scale})"
+    if pa.types.is_timestamp(arrow_type):
+        return "TIMESTAMP_TZ" if arrow_type.tz else "TIMESTAMP_NTZ"
+    if pa.types.is_date(arrow_type):
+        return "DATE"
+    if pa.types.is_time(arrow_type):
+        return "TIME"
+    if pa.types.is_binary(arrow_type) or pa.types.is_large_binary(arrow_type) or pa.types.is_fixed_size_binary(arrow_type):
+        return "BINARY"
+    if pa.types.is_list(arrow_type) or pa.types.is_large_list(arrow_type):
+        return "ARRAY"
+    if pa.types.is_struct(arrow_type) or pa.types.is_map(arrow_type):
+        return "OBJECT"
+    # strings, and all-null columns where the sample gives no type
+    return "TEXT"
+
+
+def read_sample(file_path, sample_bytes):
+    """First `sample_bytes` of a file, cut after the last complete line; the whole file if smaller"""
+    with open(file_path, 'rb') as f:
+        data = f.read(sample_bytes + 1)
+    if len(data) <= sample_bytes:
+        return data, True
+    return data[:data.rfind(b'\n') + 1], False
+
+
+def arrow_schema(file_path, sample_bytes=None):
+    """Arrow schema of a source file: Parquet from its footer, CSV/JSONL from a read of the data"""
+    if file_path.suffix == ".parquet":
+        return pq.read_schema(file_path)
+
+    source = file_path
+    if sample_bytes:
+        sample, complete = read_sample(file_path, sample_bytes)
+        if sample:
+            source = pa.BufferReader(sample)
+    if file_path.suffix == ".csv":
+        try:
+            return read_csv(source).schema
+        except pa.ArrowInvalid:
+            if not sample_bytes or complete:
+                raise
+            # the sample ended inside a quoted value; fall back to the whole file
+            return read_csv(file_path).schema
+    if file_path.suffix == ".jsonl":
+        return pa_json.read_json(source).schema
+    raise ValueError(f"Cannot infer a schema for {file_path}")
+
+
+def infer_columns(file_path, sample_bytes=None):
+    """[(column name, Snowflake type, nullable)] for a local source file, ready for table_ddl.
+
+    Columns are always nullable: a sample cannot prove the absence of NULLs.
+    """
+    if pa is None:
+        raise RuntimeError("pyarrow is not installed; it is required for --local_schema")
+    schema = arrow_schema(file_path, sample_bytes)
+    return [(field.name, snowflake_type(field.type), True) for field in schema]
@@ -1,19 +1,36 @@
 import snowflake.connector
 import os
+import re
 import argparse
 import shutil
+import time
+import traceback
+import queue
+import threading
+from contextlib import nullcontext
 import yaml
-import requests
 import json
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import unicodedata
+from load_manifest import read_manifest, write_manifest, describe_file, is_unchanged
+from parquet_convert import convert_files, CONVERT_WORKERS
+from schema_inference import infer_columns
+from download_cache import DownloadCache, link_file
+from golden import DatabaseResetter
+from load_report import LoadReport, write_report, summary_table
+from file_splitter import split_large_files, PARTS_SUFFIX
+from warehouse_policy import WarehousePolicy
+from load_verify import expected_counts, verify_load, failed_checks
+from load_journal import LoadJournal
 
 # Get current working directory (you said you're at "ELT-BENCH" level)
 base_path = Path.cwd()
 
-parser = argparse.ArgumentParser()
-parser.add_argument("--example_index", "-i", type=str, default="all", help="index range of the examples to run, e.g., '0-10', '2,3', 'all'")
-args = parser.parse_args()
+file_type_dict = {"csv": "CSV_TYPE", "jsonl": "JSON_TYPE", "parquet": "PARQUET_TYPE"}
+
+# Stage shared by all benchmark databases for --shared_stage, one <content key>/ prefix per unique file
+SHARED_STAGE = "ELT_SHARED.STAGING.CONTENT_STAGE"
 
 
 def select_tables(example_index):
@@ -29,247 +46,687 @@ def read_json(file_path):
     return data
 
 
-def load_flat_files(db_name):
+def to_file_uri(file_path):
+    # Normalize Unicode (so é is handled correctly) and convert to file:// URI
+    normalized_path = unicodedata.normalize("NFC", str(Path(file_path).resolve()))
+    return Path(normalized_path).resolve().as_uri()
+
+
+def log(db_name, message):
+    print(f"[{db_name}] {message}", flush=True)
+
+
+def fetch_dicts(cursor):
+    """Rows of the last result set as dicts keyed by lowercased column name"""
+    names = [col[0].lower() for col in cursor.description]
+    return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+def download_flat_files(db_name, cache, workers):
+    """Fetch the `flat_files` of a database's config.yaml through the download cache.
+
+    Cached files are hard-linked into data/flat_files/<db>/, so unchanged files are never
+    re-fetched and removing that directory after the load keeps the cache intact.
+    """
     folder_path = f"./elt-bench/{db_name}"
     config_path = os.path.join(folder_path, "config.yaml")
-    
+
     # Read config file
     with open(config_path, 'r') as f:
         config = yaml.safe_load(f)
-    
+
     flat_files = config.get('flat_files', [])
-    
+
     if not flat_files:
-        print("No flat files found in config", flush=True)
-        return
-    
+        log(db_name, "No flat files found in config")
+        return None
+
     # Create data directory if it doesn't exist
-    data_dir = os.path.join(folder_path, "data")
+    data_dir = base_path / "data" / "flat_files" / db_name
     os.makedirs(data_dir, exist_ok=True)
-    
+
     for file_config in flat_files:
-        table_name = file_config['table']
-        file_format = file_config['format']
-        file_url = file_config['path']
-        
-        print(f"\n{'='*60}", flush=True)
-        print(f"Processing: {table_name} ({file_format})", flush=True)
-        print(f"{'='*60}", flush=True)
-        
-        # Download file
-        local_file = os.path.join(data_dir, f"{table_name}.{file_format}")
-        print(f"Downloading from {file_url}...", flush=True)
-        
-        response = requests.get(file_url, stream=True)
-        response.raise_for_status()
-        
-        with open(local_file, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
+        log(db_name, f"Processing: {file_config['table']} ({file_config['format']}) from {file_config['path']}")
+
+    fetched = cache.fetch_all([file_config['path'] for file_config in flat_files], workers)
+
+    for file_config, (cached_file, hit) in zip(flat_files, fetched):
+        local_file = data_dir / f"{file_config['table']}.{file_config['format']}"
+        link_file(cached_file, local_file)
         file_size = os.path.getsize(local_file)
-        print(f"✓ Downloaded {file_size:,} bytes", flush=True)
-        
-    #DB data
-    for file in os.listdir(data_dir):
-        
-        # Build the path
-        file_path = base_path / "elt-bench" / db_name / "data" / file
-
-        # Normalize Unicode (so é is handled correctly)
-        normalized_path = unicodedata.normalize("NFC", str(file_path.resolve()))
-        
-        # Convert to file:// URI
-        file_uri = Path(normalized_path).resolve().as_uri()
-        
-        file_path = file_uri
-    
-        file_info = file.split(".")
-        file_name = file_info[0]
-        file_type = file_info[1]
-        
-        conn.cursor().execute("REMOVE @loading_stage")
-        conn.cursor().execute(f"PUT {file_path} @loading_stage")
-        
-        file_format = file_type_dict.get(file_type)
-        
-        conn.cursor().execute(
-        f"CREATE OR REPLACE TABLE {file_name} "
-        "USING TEMPLATE("
-        "SELECT ARRAY_AGG(OBJECT_CONSTRUCT(*)) "
-        "FROM "
-        "TABLE("
-        "INFER_SCHEMA("
-        "LOCATION => '@loading_stage',"
-        f"FILE_FORMAT => '{file_format}')))")
-        
-        # Rename columns to uppercase
-        columns = conn.cursor().execute(f"DESC TABLE {file_name}").fetchall()
-        for col in columns:
-            old_name = col[0]
-            new_name = old_name.upper()
-            if old_name != new_name:
-                conn.cursor().execute(f'ALTER TABLE {file_name} RENAME COLUMN "{old_name}" TO "{new_name}"')
-        
-        conn.cursor().execute(
-        f"COPY INTO {file_name} "
-        "FROM @loading_stage "
-        f"FILE_FORMAT = '{file_format}' "
-        "MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE")
-        
-        conn.cursor().execute("REMOVE @loading_stage")
-        
-        print(f"Finished loading file {file_name}", flush=True)
-    
-    shutil.rmtree(data_dir)
+        log(db_name, f"✓ {'Cached' if hit else 'Downloaded'} {local_file.name}: {file_size:,} bytes")
 
-file_path = './setup/destination/snowflake_credential.json' 
-snowflake_config = read_json(file_path)   
+    return data_dir
 
-conn = snowflake.connector.connect(**snowflake_config) 
-    
-file_type_dict = {"csv": "CSV_TYPE", "jsonl": "JSON_TYPE", "parquet": "PARQUET_TYPE"}
 
-names = sorted(os.listdir("./elt-bench"))
+def source_files(db_name, flat_dir):
+    """Local files to load for a database: flat files, then DB data, then API data"""
+    folders = [
+        flat_dir,
+        base_path / "data" / "source" / "db" / "data" / db_name,
+        base_path / "data" / "source" / "api" / "data" / db_name,
+    ]
+    files = []
+    for folder in folders:
+        if folder and os.path.isdir(folder):
+            files.extend(Path(folder).resolve() / file for file in sorted(os.listdir(folder)))
+    return files
 
-start, end = select_tables(args.example_index)
 
-for folder_name in names[start:end]:
-        
-    folder_path = f"./data/source/db/data/{folder_name}"
-    
-    conn.cursor().execute(f"DROP DATABASE IF EXISTS {folder_name}")
+def setup_database(conn, db_name, drop=True):
+    if drop:
+        conn.cursor().execute(f"DROP DATABASE IF EXISTS {db_name}")
 
-    conn.cursor().execute(f"CREATE DATABASE IF NOT EXISTS {folder_name}")
-    conn.cursor().execute(f"USE DATABASE {folder_name}")
+    conn.cursor().execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
+    conn.cursor().execute(f"USE DATABASE {db_name}")
     conn.cursor().execute("CREATE SCHEMA IF NOT EXISTS AIRBYTE_SCHEMA")
-    conn.cursor().execute(f"USE SCHEMA {folder_name}.AIRBYTE_SCHEMA")
+    conn.cursor().execute(f"USE SCHEMA {db_name}.AIRBYTE_SCHEMA")
     conn.cursor().execute("CREATE STAGE IF NOT EXISTS loading_stage")
 
-    conn.cursor().execute("""CREATE OR ALTER FILE FORMAT CSV_TYPE 
-                          TYPE=CSV 
+    conn.cursor().execute("""CREATE OR ALTER FILE FORMAT CSV_TYPE
+                          TYPE=CSV
                           FIELD_DELIMITER = ','
                           PARSE_HEADER = TRUE
-                          FIELD_OPTIONALLY_ENCLOSED_BY = '"' 
+                          FIELD_OPTIONALLY_ENCLOSED_BY = '"'
                           ESCAPE = NONE
                           ESCAPE_UNENCLOSED_FIELD = NONE """)
-    
+
     conn.cursor().execute("CREATE OR ALTER FILE FORMAT PARQUET_TYPE TYPE=PARQUET")
     conn.cursor().execute("CREATE OR ALTER FILE FORMAT JSON_TYPE TYPE=JSON")
-    
-    load_flat_files(folder_name)
-    
-    if os.path.isdir(folder_path):
-
-        #DB data
-        for file in os.listdir(folder_path):
-            
-            # Build the path dynamically
-            file_path = base_path / "data" / "source" / "db" / "data" / folder_name / file
-            
-            # Normalize the entire path (base + subfolders + filename)
-            normalized_path = unicodedata.normalize("NFC", str(file_path))
-            
-            # Convert to file:// URI
-            file_uri = Path(normalized_path).resolve().as_uri()
-
-            #file_path = f"file:///Users/quentinsandoz/Repos/ELT-Bench/setup/data/{folder_name}/{file}"
-            
-            file_path = file_uri
-            
-            file_info = file.split(".")
-            file_name = file_info[0]
-            file_type = file_info[1]
-            
-            conn.cursor().execute("REMOVE @loading_stage")
-            conn.cursor().execute(f"PUT {file_path} @loading_stage")
-            
-            file_format = file_type_dict.get(file_type)
-            
-            conn.cursor().execute(
-            f"CREATE OR REPLACE TABLE {file_name} "
-            "USING TEMPLATE("
-            "SELECT ARRAY_AGG(OBJECT_CONSTRUCT(*)) "
-            "FROM "
-            "TABLE("
-            "INFER_SCHEMA("
-            "LOCATION => '@loading_stage',"
-            f"FILE_FORMAT => '{file_format}')))")
-            
-            # Rename columns to uppercase
-            columns = conn.cursor().execute(f"DESC TABLE {file_name}").fetchall()
-            for col in columns:
-                old_name = col[0]
-                new_name = old_name.upper()
-                if old_name != new_name:
-                    conn.cursor().execute(f'ALTER TABLE {file_name} RENAME COLUMN "{old_name}" TO "{new_name}"')
-            
-            conn.cursor().execute(
-            f"COPY INTO {file_name} "
-            "FROM @loading_stage "
-            f"FILE_FORMAT = '{file_format}' "
-            "MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE")
-            
-            conn.cursor().execute("REMOVE @loading_stage")
-            
-            print(f"Finished loading file {file_name}", flush=True)
-        
-    folder_path = f"./data/source/api/data/{folder_name}"
-    
-    if os.path.isdir(folder_path):
-        
-        #API Data
-        for file in os.listdir(folder_path):
-            
-            # Build the path dynamically
-            file_path = base_path / "data" / "source" / "api" / "data" /folder_name / file
-
-            
-            # Normalize the entire path (base + subfolders + filename)
-            normalized_path = unicodedata.normalize("NFC", str(file_path))
-        
-            # Convert to file:// URI
-            file_uri = Path(normalized_path).resolve().as_uri()
-            
-            file_path = file_uri
-
-            #file_path = f"file:///Users/quentinsandoz/Repos/ELT-Bench/elt-docker/rest_api/data/{folder_name}/{file}"
-            
-            file_info = file.split(".")
-            file_name = file_info[0]
-            file_type = file_info[1]
-            
-            conn.cursor().execute("REMOVE @loading_stage")
-            conn.cursor().execute(f"PUT {file_path} @loading_stage ")
-            
-            file_format = file_type_dict.get(file_type)
-            
-            conn.cursor().execute(
-            f"CREATE OR REPLACE TABLE {file_name} "
-            "USING TEMPLATE("
-            "SELECT ARRAY_AGG(OBJECT_CONSTRUCT(*)) "
-            "FROM "
-            "TABLE("
-            "INFER_SCHEMA("
-            "LOCATION => '@loading_stage',"
-            f"FILE_FORMAT => '{file_format}')))")
-            
-            # Rename columns to uppercase
-            columns = conn.cursor().execute(f"DESC TABLE {file_name}").fetchall()
-            for col in columns:
-                old_name = col[0]
-                new_name = old_name.upper()
-                if old_name != new_name:
-                    conn.cursor().execute(f'ALTER TABLE {file_name} RENAME COLUMN "{old_name}" TO "{new_name}"')
-            
-            conn.cursor().execute(
-            f"COPY INTO {file_name} "
-            "FROM @loading_stage "
-            f"FILE_FORMAT = '{file_format}' "
-            "MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE")
-            
-            conn.cursor().execute("REMOVE @loading_stage")
-            
-            print(f"Finished loading file {file_name}", flush=True)
-    
-    print(f"Finished DB {folder_name}", flush=True)
\ No newline at end of file
+
+
+def table_ddl(file_name, columns):
+    """CREATE OR REPLACE TABLE statement for [(column name, Snowflake type, nullable)], with uppercased column names"""
+    column_defs = []
+    for name, col_type, nullable in columns:
+        column_def = f'"{name.upper()}" {col_type}'
+        if not nullable:
+            column_def += " NOT NULL"
+        column_defs.append(column_def)
+    return f"CREATE OR REPLACE TABLE {file_name} ({', '.join(column_defs)})"
+
+
+def create_table(conn, report, file_path, file_format, location, staged_name=None):
+    """Create a table in one statement from the INFER_SCHEMA columns of `location`"""
+    file_name = file_path.name.split(".")[0]
+    files = f"FILES => '{staged_name}'," if staged_name else ""
+    cursor = conn.cursor()
+    with report.phase("infer", file_path.name):
+        cursor.execute(
+        "SELECT COLUMN_NAME, TYPE, NULLABLE "
+        "FROM "
+        "TABLE("
+        "INFER_SCHEMA("
+        f"LOCATION => '{location}',"
+        f"{files}"
+        f"FILE_FORMAT => '{file_format}')) "
+        "ORDER BY ORDER_ID")
+        columns = cursor.fetchall()
+    with report.phase("create", file_path.name):
+        conn.cursor().execute(table_ddl(file_name, columns))
+
+
+def create_table_local(conn, report, file_path, source_path, sample_bytes=None):
+    """Create a table from columns inferred locally, without touching the stage.
+
+    Split files are inferred from their original source, everything else from the file
+    that is uploaded (so converted Parquet is read from its footer).
+    """
+    schema_file = source_path if is_parts(file_path) else file_path
+    with report.phase("infer", file_path.name):
+        columns = infer_columns(schema_file, sample_bytes)
+    with report.phase("create", file_path.name):
+        conn.cursor().execute(table_ddl(file_path.name.split(".")[0], columns))
+
+
+def copy_into(conn, report, file_path, file_format, location="@loading_stage", pattern=None):
+    """COPY INTO a table from `location`; returns the rows loaded according to the COPY result
+
+    rows_loaded and errors_seen are summed over the result's rows (one per staged file) and
+    kept in the report, so the load can be verified without querying the table again.
+    """
+    file_name = file_path.name.split(".")[0]
+    pattern = f"PATTERN = '{pattern}' " if pattern else ""
+    cursor = conn.cursor()
+    with report.phase("copy", file_path.name):
+        cursor.execute(
+        f"COPY INTO {file_name} "
+        f"FROM {location} "
+        f"{pattern}"
+        f"FILE_FORMAT = '{file_format}' "
+        "MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE")
+        copy_rows = fetch_dicts(cursor)
+    rows_loaded = sum(row.get('rows_loaded') or 0 for row in copy_rows)
+    errors_seen = sum(row.get('errors_seen') or 0 for row in copy_rows)
+    first_error = next((row['first_error'] for row in copy_rows if row.get('first_error')), None)
+    report.record(file_path.name, table=file_name, rows_loaded=rows_loaded, errors_seen=errors_seen, first_error=first_error)
+    return rows_loaded
+
+
+def is_parts(file_path):
+    return file_path.name.endswith(PARTS_SUFFIX)
+
+
+def put_parts(conn, report, parts_path, location, parallel):
+    """PUT the gzip chunks of a split file under `location`; returns the staged chunk names"""
+    cursor = conn.cursor()
+    with report.phase("put", parts_path.name):
+        cursor.execute(f"PUT '{to_file_uri(parts_path)}/*.gz' {location} PARALLEL={parallel} AUTO_COMPRESS=FALSE")
+        put_rows = fetch_dicts(cursor)
+    report.record_put(put_rows, parts_path.name)
+    return sorted(row['target'] for row in put_rows)
+
+
+def load_file(conn, report, file_path, source_path, parallel, local_schema=False, sample_bytes=None):
+    """Load one file (or the chunks of a split file) through an emptied @loading_stage:
+    PUT, create table, COPY, REMOVE.
+
+    With local_schema the table is created before the PUT, skipping INFER_SCHEMA.
+    """
+    file_info = file_path.name.split(".")
+    file_name = file_info[0]
+    file_type = file_info[1]
+
+    if local_schema:
+        create_table_local(conn, report, file_path, source_path, sample_bytes)
+
+    with report.phase("remove", file_path.name):
+        conn.cursor().execute("REMOVE @loading_stage")
+    staged_name = None
+    if is_parts(file_path):
+        staged_name = put_parts(conn, report, file_path, "@loading_stage", parallel)[0]
+    else:
+        cursor = conn.cursor()
+        with report.phase("put", file_path.name):
+            cursor.execute(f"PUT {to_file_uri(file_path)} @loading_stage AUTO_COMPRESS={auto_compress([file_path])}")
+            report.record_put(fetch_dicts(cursor))
+
+    file_format = file_type_dict.get(file_type)
+
+    if not local_schema:
+        create_table(conn, report, file_path, file_format, "@loading_stage", staged_name)
+
+    rows_loaded = copy_into(conn, report, file_path, file_format)
+
+    with report.phase("remove", file_path.name):
+        conn.cursor().execute("REMOVE @loading_stage")
+
+    log(report.db_name, f"Finished loading file {file_name}")
+    return rows_loaded
+
+
+def auto_compress(files):
+    # Parquet is compressed internally; gzipping it again only costs CPU
+    return "FALSE" if all(f.suffix == ".parquet" for f in files) else "TRUE"
+
+
+def stage_files(conn, report, files, parallel):
+    """PUT all files of a database with a single multi-file PUT.
+
+    A wildcard PUT only reads one local directory, so the files are first linked into
+    data/staging/<db>/0/ and PUT under @loading_stage/files.0/. A name that occurs in
+    more than one source folder gets its own directory (1/, 2/, ...), PUT and stage prefix,
+    so neither link nor staged file collides. Split files are PUT separately, each under its
+    own @loading_stage/<table>/ prefix so that COPY can load the chunks in parallel.
+    Returns {file path: (stage location, staged file name)}.
+    """
+    staged = {}
+    single_files = [file_path for file_path in files if not is_parts(file_path)]
+    for parts_path in files:
+        if is_parts(parts_path):
+            location = f"@loading_stage/{parts_path.name.split('.')[0]}/"
+            staged[parts_path] = (location, put_parts(conn, report, parts_path, location, parallel)[0])
+    if not single_files:
+        return staged
+
+    # The n-th file with a given name goes to batch n; table names have no ".", so files.<n> is no table's prefix
+    batches = []
+    for file_path in single_files:
+        batch = next((batch for batch in batches if file_path.name not in batch), None)
+        if batch is None:
+            batch = {}
+            batches.append(batch)
+        batch[file_path.name] = file_path
+
+    staging_dir = base_path / "data" / "staging" / report.db_name
+    if staging_dir.exists():
+        shutil.rmtree(staging_dir)
+    cursor = conn.cursor()
+    for index, batch in enumerate(batches):
+        batch_dir = staging_dir / str(index)
+        batch_dir.mkdir(parents=True)
+        for file_path in batch.values():
+            os.symlink(file_path, batch_dir / file_path.name)
+        location = f"@loading_stage/files.{index}/"
+        with report.phase("put"):
+            cursor.execute(f"PUT '{to_file_uri(batch_dir)}/*' {location} PARALLEL={parallel} AUTO_COMPRESS={auto_compress(list(batch.values()))}")
+            put_rows = fetch_dicts(cursor)
+        report.record_put(put_rows)
+        targets = {row['source']: row['target'] for row in put_rows}
+        staged.update({file_path: (location, targets[name]) for name, file_path in batch.items()})
+    shutil.rmtree(staging_dir)
+    return staged
+
+
+def load_database_staged(conn, report, upload_files, parallel, local_schema=False, sample_bytes=None, on_loaded=None):
+    """Load a database with one PUT, then one CREATE + COPY per table selected by PATTERN
+    (or by its own prefix, for split files).
+
+    `upload_files` maps each file to upload to its source file. With local_schema the
+    tables are created from locally inferred DDL while the PUT is still uploading.
+    `on_loaded(file_path, rows)` is called as each table's COPY completes.
+    Returns {file path: rows loaded}.
+    """
+    if not upload_files:
+        return {}
+    with report.phase("remove"):
+        conn.cursor().execute("REMOVE @loading_stage")
+    with ThreadPoolExecutor(max_workers=1) as upload:
+        put = upload.submit(stage_files, conn, report, list(upload_files), parallel)
+        if local_schema:
+            for file_path, source_path in upload_files.items():
+                create_table_local(conn, report, file_path, source_path, sample_bytes)
+        staged = put.result()
+
+    rows_loaded = {}
+    for file_path in upload_files:
+        file_info = file_path.name.split(".")
+        file_name = file_info[0]
+        file_type = file_info[1]
+        location, staged_name = staged[file_path]
+
+        file_format = file_type_dict.get(file_type)
+
+        if not local_schema:
+            create_table(conn, report, file_path, file_format, location, staged_name)
+
+        if is_parts(file_path):
+            rows_loaded[file_path] = copy_into(conn, report, file_path, file_format, location)
+        else:
+            rows_loaded[file_path] = copy_into(conn, report, file_path, file_format, location, f"(.*/)?{re.escape(staged_name)}")
+        if on_loaded:
+            on_loaded(file_path, rows_loaded[file_path])
+
+        log(report.db_name, f"Finished loading file {file_name}")
+
+    with report.phase("remove"):
+        conn.cursor().execute("REMOVE @loading_stage")
+    return rows_loaded
+
+
+def put_file(conn, report, file_path, location, parallel):
+    """PUT one file (or the chunks of a split file) under `location`; returns the staged name to infer from"""
+    if is_parts(file_path):
+        return put_parts(conn, report, file_path, location, parallel)[0]
+    cursor = conn.cursor()
+    with report.phase("put", file_path.name):
+        cursor.execute(f"PUT {to_file_uri(file_path)} {location} AUTO_COMPRESS={auto_compress([file_path])}")
+        put_rows = fetch_dicts(cursor)
+    report.record_put(put_rows)
+    return put_rows[0]['target']
+
+
+def load_database_pipelined(conn, upload_conn, report, upload_files, parallel, local_schema=False, sample_bytes=None, on_loaded=None):
+    """Load a database file by file, uploading the next file while the current one is copied.
+
+    A producer thread PUTs each file under its own @loading_stage/<table>/ prefix on
+    `upload_conn`; the calling thread creates and COPYs the tables on `conn` as their
+    files arrive, then removes the prefix. At most one uploaded file waits for its COPY.
+    Returns {file path: rows loaded}.
+    """
+    if not upload_files:
+        return {}
+    upload_conn.cursor().execute(f"USE SCHEMA {report.db_name}.AIRBYTE_SCHEMA")
+    with report.phase("remove"):
+        conn.cursor().execute("REMOVE @loading_stage")
+
+    uploaded = queue.Queue(maxsize=1)
+    stop = threading.Event()
+
+    def produce():
+        try:
+            for file_path in upload_files:
+                if stop.is_set():
+                    return
+                location = f"@loading_stage/{file_path.name.split('.')[0]}/"
+                item = (file_path, location, put_file(upload_conn, report, file_path, location, parallel))
+                while not stop.is_set():
+                    try:
+                        uploaded.put(item, timeout=1)
+                        break
+                    except queue.Full:
+                        pass
+        finally:
+            uploaded.put(None)
+
+    rows_loaded = {}
+    with ThreadPoolExecutor(max_workers=1) as upload:
+        producer = upload.submit(produce)
+        try:
+            while (item := uploaded.get()) is not None:
+                file_path, location, staged_name = item
+                file_name, file_type = file_path.name.split(".")[:2]
+                file_format = file_type_dict.get(file_type)
+
+                if local_schema:
+                    create_table_local(conn, report, file_path, upload_files[file_path], sample_bytes)
+                else:
+                    create_table(conn, report, file_path, file_format, location, staged_name)
+                rows_loaded[file_path] = copy_into(conn, report, file_path, file_format, location)
+                with report.phase("remove", file_path.name):
+                    conn.cursor().execute(f"REMOVE {location}")
+                if on_loaded:
+                    on_loaded(file_path, rows_loaded[file_path])
+
+                log(report.db_name, f"Finished loading file {file_name}")
+        finally:
+            stop.set()
+            # Unblock the producer's final put if the COPY side failed early
+            while not producer.done():
+                try:
+                    uploaded.get(timeout=1)
+                except queue.Empty:
+                    pass
+        producer.result()
+    return rows_loaded
+
+
+def setup_shared_stage(conn, db_name):
+    database, schema, _ = SHARED_STAGE.split(".")
+    conn.cursor().execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+    conn.cursor().execute(f"CREATE SCHEMA IF NOT EXISTS {database}.{schema}")
+    conn.cursor().execute(f"CREATE STAGE IF NOT EXISTS {SHARED_STAGE}")
+    # CREATE DATABASE/SCHEMA switch the session to the new objects
+    conn.cursor().execute(f"USE SCHEMA {db_name}.AIRBYTE_SCHEMA")
+
+
+def content_key(file_path, sha256, options):
+    """Shared-stage prefix for an upload: the source file's sha256, qualified by how it was transformed"""
+    if is_parts(file_path):
+        return f"{sha256}_split{options.split_mb}"
+    if file_path.suffix == ".parquet":
+        return f"{sha256}_parquet"
+    return sha256
+
+
+def load_database_shared(conn, report, upload_files, keys, parallel, local_schema=False, sample_bytes=None, on_loaded=None):
+    """Load a database from the content-addressed SHARED_STAGE.
+
+    `keys` maps each file to its content key. A file is only PUT if no database has staged
+    the same content before; its tables are then COPYed straight from @SHARED_STAGE/<key>/,
+    which is never cleared, so identical files across databases are uploaded once.
+    Returns {file path: rows loaded}.
+    """
+    setup_shared_stage(conn, report.db_name)
+    rows_loaded = {}
+    for file_path, source_path in upload_files.items():
+        file_name, file_type = file_path.name.split(".")[:2]
+        location = f"@{SHARED_STAGE}/{keys[file_path]}/"
+        file_format = file_type_dict.get(file_type)
+
+        cursor = conn.cursor()
+        with report.phase("put", file_path.name):
+            cursor.execute(f"LIST {location}")
+            listed = sorted(row['name'] for row in fetch_dicts(cursor))
+        # An interrupted PUT of a split file can leave only some of its chunks behind
+        expected = len(list(file_path.glob("*.gz"))) if is_parts(file_path) else 1
+        if len(listed) >= expected:
+            staged_name = listed[0].rsplit("/", 1)[-1]
+            report.record(file_path.name, shared_hit=True)
+            log(report.db_name, f"Already on the shared stage: {file_path.name}")
+        else:
+            staged_name = put_file(conn, report, file_path, location, parallel)
+            report.record(file_path.name, shared_hit=False)
+
+        if local_schema:
+            create_table_local(conn, report, file_path, source_path, sample_bytes)
+        else:
+            create_table(conn, report, file_path, file_format, location, staged_name)
+        rows_loaded[file_path] = copy_into(conn, report, file_path, file_format, location)
+        if on_loaded:
+            on_loaded(file_path, rows_loaded[file_path])
+
+        log(report.db_name, f"Finished loading file {file_name}")
+    return rows_loaded
+
+
+def existing_tables(conn, db_name):
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT table_name FROM {db_name}.information_schema.tables "
+        "WHERE table_schema = 'AIRBYTE_SCHEMA' AND table_type = 'BASE TABLE'")
+    return {row[0] for row in cursor.fetchall()}
+
+
+def manifest_key(file_path):
+    return os.path.relpath(file_path, base_path)
+
+
+def load_database(conn, report, options, previous=None, upload_conn=None):
+    """Load every source file of a database.
+
+    With options.incremental the database is kept and only tables whose source file changed
+    since the manifest entries in `previous` (or that are missing in Snowflake) are reloaded.
+    With options.resume, tables the checkpoint journal lists as loaded are kept as they are.
+    options.pipeline uploads on `upload_conn` while COPY runs on `conn`; options.shared_stage
+    takes precedence over both and uploads each distinct file once across databases.
+    Returns the database's new manifest entries.
+    """
+    db_name = report.db_name
+    previous = previous or {}
+    journal = LoadJournal(options.checkpoint)
+    checkpointed = journal.read()[0].get(db_name, {}) if options.resume else {}
+    setup_database(conn, db_name, drop=not (options.incremental or checkpointed))
+
+    flat_dir = download_flat_files(db_name, DownloadCache(options.download_cache), options.download_workers)
+    files = source_files(db_name, flat_dir)
+
+    entries = {}
+    for file_path in files:
+        key = manifest_key(file_path)
+        entries[key] = describe_file(file_path, previous.get(key))
+        entries[key].update({"database": db_name, "table": file_path.name.split(".")[0], "rows_loaded": None})
+
+    if options.incremental:
+        tables = existing_tables(conn, db_name)
+        to_load = []
+        for file_path in files:
+            key = manifest_key(file_path)
+            if is_unchanged(entries[key], previous.get(key)) and entries[key]["table"].upper() in tables:
+                entries[key]["rows_loaded"] = previous[key]["rows_loaded"]
+                log(db_name, f"Unchanged, skipping {file_path.name}")
+            else:
+                to_load.append(file_path)
+        files = to_load
+
+    if checkpointed:
+        to_load = []
+        for file_path in files:
+            entry = entries[manifest_key(file_path)]
+            if entry["table"].upper() in checkpointed:
+                entry["rows_loaded"] = checkpointed[entry["table"].upper()]
+                log(db_name, f"Checkpointed, skipping {file_path.name}")
+            else:
+                to_load.append(file_path)
+        files = to_load
+
+    # {file to upload: source file}; converted Parquet files and split chunk directories
+    # stand in for their CSV/JSONL source
+    if options.parquet:
+        upload_files = convert_files(files, base_path / "data" / "parquet" / db_name, options.convert_workers)
+        log(db_name, f"Converted {len(upload_files)} files to Parquet")
+    else:
+        upload_files = {file_path: file_path for file_path in files}
+
+    if options.split_mb:
+        split = split_large_files(list(upload_files), base_path / "data" / "chunks" / db_name,
+                                  options.split_threshold_mb * 1024 * 1024, options.split_mb * 1024 * 1024)
+        upload_files = {upload: upload_files[original] for upload, original in split.items()}
+        for upload in upload_files:
+            if is_parts(upload):
+                log(db_name, f"Split {upload_files[upload].name} into {len(list(upload.glob('*.gz')))} chunks")
+
+    def on_loaded(file_path, rows):
+        journal.table_done(db_name, file_path.name.split(".")[0], rows)
+
+    sample_bytes = options.infer_sample_mb * 1024 * 1024 if options.infer_sample_mb else None
+    if options.shared_stage:
+        keys = {upload: content_key(upload, entries[manifest_key(source)]["sha256"], options)
+                for upload, source in upload_files.items()}
+        rows_loaded = load_database_shared(conn, report, upload_files, keys, options.parallel,
+                                           options.local_schema, sample_bytes, on_loaded)
+    elif options.staged:
+        rows_loaded = load_database_staged(conn, report, upload_files, options.parallel, options.local_schema, sample_bytes, on_loaded)
+    elif options.pipeline:
+        rows_loaded = load_database_pipelined(conn, upload_conn, report, upload_files, options.parallel,
+                                              options.local_schema, sample_bytes, on_loaded)
+    else:
+        rows_loaded = {}
+        for file_path, source_path in upload_files.items():
+            rows_loaded[file_path] = load_file(conn, report, file_path, source_path, options.parallel, options.local_schema, sample_bytes)
+            on_loaded(file_path, rows_loaded[file_path])
+    for file_path, rows in rows_loaded.items():
+        entries[manifest_key(upload_files[file_path])]["rows_loaded"] = rows
+
+    if options.table_json:
+        report.verification = verify_load(entries, report, expected_counts(options.table_json, db_name))
+        for table, check in failed_checks(report.verification).items():
+            log(db_name, f"Verification {check['status']}: {table} expected {check['expected']}, "
+                         f"loaded {check['rows_loaded']}, errors {check['errors_seen']}")
+
+    if flat_dir:
+        shutil.rmtree(flat_dir)
+
+    if options.golden:
+        resetter = DatabaseResetter.for_connection(conn)
+        resetter.promote(db_name)
+        log(db_name, f"Saved golden copy {resetter.golden_name(db_name)}")
+
+    journal.database_done(db_name)
+    log(db_name, "Finished DB")
+    return entries
+
+
+worker_conn = None
+worker_upload_conn = None
+
+
+def init_worker(snowflake_config, pipeline=False):
+    """Give each loader process its own connection, plus one for uploads when pipelining"""
+    global worker_conn, worker_upload_conn
+    worker_conn = snowflake.connector.connect(**snowflake_config)
+    if pipeline:
+        worker_upload_conn = snowflake.connector.connect(**snowflake_config)
+
+
+def run_load(db_name, options, previous):
+    """Load one database on the worker's connection; never raises, returns a summary row"""
+    started = time.monotonic()
+    entries = None
+    report = LoadReport(db_name)
+    try:
+        if options.reset:
+            DatabaseResetter.for_connection(worker_conn).reset(db_name)
+            log(db_name, "Reset from golden copy")
+        elif options.resume and db_name in LoadJournal(options.checkpoint).read()[1]:
+            log(db_name, "Already loaded according to the checkpoint journal, skipping")
+        else:
+            entries = load_database(worker_conn, report, options, previous, worker_upload_conn)
+        error = None
+    except Exception as e:
+        log(db_name, traceback.format_exc())
+        error = str(e).splitlines()[0] if str(e) else type(e).__name__
+        # A failed full load dropped the database, so none of its old manifest entries hold
+        if not options.incremental and not options.reset and not options.resume:
+            entries = {}
+    return {"database": db_name, "seconds": time.monotonic() - started, "error": error, "manifest": entries, "report": report.to_dict()}
+
+
+def print_summary(results, elapsed):
+    failed = [r for r in results if r["error"]]
+    print(f"\n{'='*60}", flush=True)
+    print(f"Loaded {len(results) - len(failed)}/{len(results)} databases in {elapsed:.1f}s", flush=True)
+    for line in summary_table(results):
+        print(line, flush=True)
+    for r in failed:
+        print(f"  FAILED {r['database']}: {r['error']}", flush=True)
+    for r in results:
+        for table, check in failed_checks((r["report"] or {}).get("verification") or {}).items():
+            print(f"  {check['status'].upper()} {r['database']}.{table}: expected {check['expected']}, "
+                  f"loaded {check['rows_loaded']}, errors {check['errors_seen']}", flush=True)
+    print(f"{'='*60}", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--example_index", "-i", type=str, default="all", help="index range of the examples to run, e.g., '0-10', '2,3', 'all'")
+    parser.add_argument("--staged", action="store_true", help="PUT all files of a database at once and COPY each table by PATTERN, instead of one PUT/COPY/REMOVE cycle per file")
+    parser.add_argument("--parallel", type=int, default=4, help="Upload threads (PARALLEL=n) for multi-file PUTs (--staged, split files)")
+    parser.add_argument("--pipeline", action="store_true", help="Per-file loading with the next file's PUT (on a second connection) overlapping the current file's COPY")
+    parser.add_argument("--shared_stage", action="store_true", help=f"PUT each distinct file (by sha256) once to {SHARED_STAGE} and COPY every database from there")
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="Number of worker processes, each loading databases on its own connection")
+    parser.add_argument("--incremental", action="store_true", help="Keep existing databases and reload only tables whose source file changed since the last load")
+    parser.add_argument("--parquet", action="store_true", help="Convert CSV/JSONL sources to typed, Snappy-compressed Parquet locally and upload that instead")
+    parser.add_argument("--convert_workers", type=int, default=CONVERT_WORKERS, help="Parallel Parquet conversions per database; each streams its file, holding a few 16 MB blocks in memory")
+    parser.add_argument("--local_schema", action="store_true", help="Infer table DDL locally with pyarrow instead of running INFER_SCHEMA on the stage")
+    parser.add_argument("--infer_sample_mb", type=int, default=None, help="Infer CSV/JSONL types from the first N MB only (default: whole file; Parquet always uses its footer)")
+    parser.add_argument("--download_cache", type=str, default="./data/cache/downloads", help="Content-addressed cache for flat_files downloads")
+    parser.add_argument("--download_workers", type=int, default=8, help="Concurrent flat_files downloads per database")
+    parser.add_argument("--golden", action="store_true", help="After loading, snapshot each database as a zero-copy <db>_GOLDEN clone")
+    parser.add_argument("--reset", action="store_true", help="Do not load; reset each database to a clone of its golden copy")
+    parser.add_argument("--split_mb", type=int, default=None, help="Split large CSV/JSONL files into gzip chunks of about N MB, staged under one prefix per table")
+    parser.add_argument("--split_threshold_mb", type=int, default=1024, help="Only files larger than this are split")
+    parser.add_argument("--report_dir", type=str, default="./data/load_reports", help="Where the per-run JSON load report is written")
+    parser.add_argument("--manifest", type=str, default="./data/load_manifest.json", help="Load manifest (file path -> size, mtime, sha256, table, rows loaded)")
+    parser.add_argument("--checkpoint", type=str, default="./data/load_checkpoint.jsonl", help="Journal of loaded (database, table) pairs, started afresh by every run without --resume")
+    parser.add_argument("--resume", action="store_true", help="Continue an interrupted run: skip databases and tables the checkpoint journal lists as loaded")
+    parser.add_argument("--table_json", type=str, default="./evaluation/table.json", help="Expected row counts; each table's COPY result is checked against it (empty string to skip)")
+    parser.add_argument("--warehouse_policy", type=str, default=None, help="JSON policy resizing the warehouse for the load (its 'load' size) and restoring it afterwards")
+    parser.add_argument("--warehouse_timings", type=str, default="./data/warehouse_timings.jsonl", help="Where each resized phase appends its size and duration")
+    args = parser.parse_args()
+
+    file_path = './setup/destination/snowflake_credential.json'
+    snowflake_config = read_json(file_path)
+
+    names = sorted(os.listdir("./elt-bench"))
+
+    start, end = select_tables(args.example_index)
+
+    manifest = read_manifest(args.manifest)
+    if args.resume:
+        LoadJournal(args.checkpoint).repair()
+    elif not args.reset:
+        LoadJournal(args.checkpoint).reset()
+
+    def previous_entries(db_name):
+        return {key: entry for key, entry in manifest.items() if entry["database"] == db_name}
+
+    policy_conn = snowflake.connector.connect(**snowflake_config) if args.warehouse_policy else None
+    if policy_conn:
+        load_phase = WarehousePolicy.from_file(args.warehouse_policy, policy_conn, args.warehouse_timings).phase("load")
+    else:
+        load_phase = nullcontext()
+
+    started = time.monotonic()
+    try:
+        with load_phase:
+            if args.jobs > 1:
+                with ProcessPoolExecutor(max_workers=args.jobs, initializer=init_worker, initargs=(snowflake_config, args.pipeline)) as pool:
+                    futures = [pool.submit(run_load, folder_name, args, previous_entries(folder_name)) for folder_name in names[start:end]]
+                    results = [future.result() for future in futures]
+            else:
+                init_worker(snowflake_config, args.pipeline)
+                results = [run_load(folder_name, args, previous_entries(folder_name)) for folder_name in names[start:end]]
+    finally:
+        if policy_conn:
+            policy_conn.close()
+
+    for result in results:
+        if result["manifest"] is not None:
+            manifest = {key: entry for key, entry in manifest.items() if entry["database"] != result["database"]}
+            manifest.update(result["manifest"])
+    write_manifest(args.manifest, manifest)
+
+    elapsed = time.monotonic() - started
+    print_summary(results, elapsed)
+    print(f"Load report: {write_report(args.report_dir, results, elapsed)}", flush=True)
@@ -0,0 +1,63 @@
+import json
+import os
+import time
+from contextlib import contextmanager
+
+
+class WarehousePolicy:
+    """Resize a warehouse for the duration of a phase and always put it back.
+
+    `sizes` maps a phase name ("load", "stage2", ...) to a WAREHOUSE_SIZE; phases without
+    a size run on the warehouse as it is. The original size is restored in a `finally`,
+    so a failed load or evaluation never leaves an expensive warehouse running. Every
+    phase appends {phase, size, seconds, ok} to `timings_path` to compare sizes later.
+    """
+
+    def __init__(self, execute, warehouse, sizes, timings_path=None):
+        self.execute = execute
+        self.warehouse = warehouse
+        self.sizes = sizes
+        self.timings_path = timings_path
+
+    @classmethod
+    def from_file(cls, policy_path, conn, timings_path=None):
+        with open(policy_path, 'r') as f:
+            policy = json.load(f)
+        execute = lambda sql: conn.cursor().execute(sql).fetchall()
+        return cls(execute, policy["warehouse"], policy.get("sizes", {}), timings_path)
+
+    def current_size(self):
+        rows = self.execute(f"SHOW WAREHOUSES LIKE '{self.warehouse}'")
+        if not rows:
+            raise RuntimeError(f"Warehouse {self.warehouse} not found")
+        # SHOW WAREHOUSES: name, state, type, size, ...
+        return rows[0][3]
+
+    def resize(self, size):
+        self.execute(f"ALTER WAREHOUSE {self.warehouse} SET WAREHOUSE_SIZE = '{size.upper()}' WAIT_FOR_COMPLETION = TRUE")
+
+    def record(self, phase, size, seconds, ok):
+        if not self.timings_path:
+            return
+        os.makedirs(os.path.dirname(self.timings_path) or ".", exist_ok=True)
+        with open(self.timings_path, 'a') as f:
+            f.write(json.dumps({"phase": phase, "warehouse": self.warehouse, "size": size,
+                                "seconds": seconds, "ok": ok, "at": time.strftime("%Y-%m-%dT%H:%M:%S")}) + "\n")
+
+    @contextmanager
+    def phase(self, name):
+        size = self.sizes.get(name)
+        original = self.current_size()
+        if size:
+            print(f"Resizing {self.warehouse} from {original} to {size} for {name}", flush=True)
+            self.resize(size)
+        started = time.monotonic()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            if size:
+                self.resize(original)
+                print(f"Restored {self.warehouse} to {original}", flush=True)
+            self.record(name, size or original, time.monotonic() - started, ok)
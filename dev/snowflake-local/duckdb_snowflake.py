@@ -0,0 +1,961 @@
+"""A local stand-in for snowflake.connector, backed by one DuckDB file per database.
+
+Only the subset the benchmark scripts use is emulated: connect() and cursors, USE
+DATABASE/SCHEMA/WAREHOUSE, CREATE/DROP/CLONE DATABASE, SHOW DATABASES/WAREHOUSES,
+INFORMATION_SCHEMA.TABLES/COLUMNS/SCHEMATA, stages with PUT/LIST/REMOVE, file formats,
+INFER_SCHEMA and COPY INTO from staged CSV/JSON/Parquet files, and fetch_pandas_all.
+Everything else is passed to DuckDB after Snowflake type names are translated.
+
+Databases live in <root>/<DATABASE>.duckdb and are only attached when a statement
+needs them; stages are directories under <root>/_stages. The root is SNOWFLAKE_LOCAL_ROOT,
+or data/snowflake_local in the repository.
+"""
+import os
+import re
+import glob
+import json
+import shutil
+import threading
+from urllib.parse import unquote, urlparse
+
+import duckdb
+
+apilevel = "2.0"
+threadsafety = 2
+paramstyle = "pyformat"
+
+DEFAULT_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "data", "snowflake_local")
+COMPRESSED = (".gz", ".bz2", ".zst", ".br", ".deflate", ".parquet")
+
+
+class Error(Exception):
+    def __init__(self, msg=None, errno=None, sqlstate=None, sfqid=None, **kwargs):
+        super().__init__(msg)
+        self.msg = msg
+        self.errno = errno
+        self.sqlstate = sqlstate
+        self.sfqid = sfqid
+
+
+class InterfaceError(Error):
+    pass
+
+
+class DatabaseError(Error):
+    pass
+
+
+class ProgrammingError(DatabaseError):
+    pass
+
+
+class OperationalError(DatabaseError):
+    pass
+
+
+class NotSupportedError(DatabaseError):
+    pass
+
+
+class DictCursor:
+    """Marker accepted by Connection.cursor(), as in snowflake.connector"""
+
+
+IDENTIFIER = r'(?:"(?:[^"]|"")*"|[A-Za-z_][\w$]*)'
+QUALIFIED = rf'{IDENTIFIER}(?:\s*\.\s*{IDENTIFIER}){{0,2}}'
+STAGE_LOCATION = rf"'?@(?:~|%?{QUALIFIED})(?:/[^\s']*)?'?"
+OPTION = re.compile(r"(\w+)\s*(?:=>|=)\s*('(?:[^']|'')*'|\([^)]*\)|[^\s,)]+)")
+INFORMATION_SCHEMA = re.compile(rf'(?:({IDENTIFIER})\s*\.\s*)?\binformation_schema\s*\.\s*(tables|columns|schemata)\b', re.I)
+THREE_PART = re.compile(rf'({IDENTIFIER})\s*\.\s*{IDENTIFIER}\s*\.\s*{IDENTIFIER}')
+INFER_SCHEMA = re.compile(r'TABLE\s*\(\s*INFER_SCHEMA\s*\((.*?)\)\s*\)', re.I | re.S)
+
+# Snowflake type names DuckDB lacks or reads differently (FLOAT is double precision in Snowflake)
+TYPE_RULES = [
+    (r'NUMBER\s*\(\s*\d+\s*(?:,\s*0\s*)?\)', 'BIGINT'),
+    (r'NUMBER\s*\(\s*(\d+)\s*,\s*(\d+)\s*\)', r'DECIMAL(\1,\2)'),
+    (r'NUMBER', 'BIGINT'),
+    (r'TIMESTAMP_NTZ(?:\s*\(\s*\d+\s*\))?', 'TIMESTAMP'),
+    (r'TIMESTAMP_(?:TZ|LTZ)(?:\s*\(\s*\d+\s*\))?', 'TIMESTAMPTZ'),
+    (r'(?:FLOAT[48]?|DOUBLE\s+PRECISION|REAL)', 'DOUBLE'),
+    (r'(?:VARIANT|OBJECT|ARRAY)', 'VARCHAR'),
+    (r'(?:VAR)?BINARY(?:\s*\(\s*\d+\s*\))?', 'BLOB'),
+]
+TYPE_NAMES = '|'.join(f'(?:{pattern})' for pattern, _ in TYPE_RULES)
+# In a CREATE TABLE a type follows a column name (or ::); elsewhere only casts are translated
+# (a part starting with whitespace follows a quoted column name)
+TYPE_IN_DDL = re.compile(rf'(?P<prefix>(?<=\w)\s+|^\s+|::\s*)(?P<type>{TYPE_NAMES})(?![\w$])', re.I)
+TYPE_IN_CAST = re.compile(rf'(?P<prefix>::\s*|\bAS\s+(?=(?:{TYPE_NAMES})\s*\)))(?P<type>{TYPE_NAMES})(?![\w$])', re.I)
+CREATE_TABLE = re.compile(r'^\s*CREATE\s+(?:OR\s+REPLACE\s+)?(?:(?:LOCAL|GLOBAL)\s+)?(?:TEMP|TEMPORARY|TRANSIENT|VOLATILE)?\s*TABLE\b', re.I)
+
+
+def connect(**kwargs):
+    return Connection(**kwargs)
+
+
+class Instance:
+    """One DuckDB instance per root and process, shared by its connections.
+
+    A database file can only be attached once per process, so connections are cursors
+    of the same instance: attached databases are shared, while USE and temp tables stay
+    per connection, like a Snowflake session.
+    """
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.duck = duckdb.connect()
+        self.attached = set()
+        self.lock = threading.Lock()
+        # Bumped on DETACH, so connections know to re-attach and USE their database again
+        self.generation = 0
+
+    @classmethod
+    def get(cls, root):
+        with cls._lock:
+            if root not in cls._instances:
+                cls._instances[root] = cls()
+            return cls._instances[root]
+
+
+def identifier(name):
+    """Snowflake identifier resolution: quoted names keep their case, unquoted are uppercased"""
+    name = name.strip()
+    if name.startswith('"'):
+        return name[1:-1].replace('""', '"')
+    return name.upper()
+
+
+def split_qualified(name):
+    return [identifier(part) for part in re.findall(IDENTIFIER, name)]
+
+
+def quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def option_value(value):
+    value = value.strip()
+    if value.startswith("'"):
+        return value[1:-1].replace("''", "'")
+    if value.startswith("("):
+        return value
+    return value.upper()
+
+
+def string_list(value):
+    """The strings of an option given as ('a', 'b') or as a single 'a'"""
+    if value.startswith("("):
+        return [v[1:-1].replace("''", "'") for v in re.findall(r"'(?:[^']|'')*'", value)]
+    return [value]
+
+
+def parse_options(text):
+    return {key.upper(): option_value(value) for key, value in OPTION.findall(text)}
+
+
+def strip_comments(sql):
+    sql = re.sub(r'/\*.*?\*/', ' ', sql, flags=re.S)
+    sql = re.sub(r'^\s*--[^\n]*$', '', sql, flags=re.M)
+    return sql.strip().rstrip(';').strip()
+
+
+def outside_quotes(sql, transform):
+    """Apply `transform` to the parts of `sql` that are not string literals or quoted identifiers"""
+    parts = re.split(r"('(?:[^'\\]|''|\\.)*'|\"(?:[^\"]|\"\")*\")", sql)
+    return ''.join(part if i % 2 else transform(part) for i, part in enumerate(parts))
+
+
+def translate_types(sql):
+    def replace(match):
+        prefix, name = match.group('prefix'), match.group('type')
+        for pattern, target in TYPE_RULES:
+            if re.fullmatch(pattern, name, re.I):
+                return prefix + re.sub(pattern, target, name, flags=re.I)
+        return match.group(0)
+
+    if CREATE_TABLE.match(sql):
+        sql = re.sub(r'\b(TRANSIENT|VOLATILE)\s+', '', sql, count=1, flags=re.I)
+        return outside_quotes(sql, lambda part: TYPE_IN_DDL.sub(replace, part))
+    return outside_quotes(sql, lambda part: TYPE_IN_CAST.sub(replace, part))
+
+
+def translate_params(sql, params):
+    """pyformat (%s / %(name)s) parameters to DuckDB's ? / $name"""
+    if params is None:
+        return sql, None
+    if isinstance(params, dict):
+        return re.sub(r'%\((\w+)\)s', r'$\1', sql), params
+    return sql.replace('%s', '?'), list(params)
+
+
+def snowflake_type(duck_type):
+    """Snowflake name of a DuckDB column type, as INFER_SCHEMA and INFORMATION_SCHEMA report it"""
+    duck_type = duck_type.upper()
+    decimal = re.match(r'DECIMAL\((\d+),\s*(\d+)\)', duck_type)
+    if decimal:
+        return f"NUMBER({decimal.group(1)}, {decimal.group(2)})"
+    if duck_type in ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT', 'UINTEGER', 'UBIGINT'):
+        return "NUMBER(38, 0)"
+    if duck_type in ('FLOAT', 'DOUBLE'):
+        return "FLOAT"
+    if duck_type == 'TIMESTAMP WITH TIME ZONE':
+        return "TIMESTAMP_TZ"
+    if duck_type.startswith('TIMESTAMP'):
+        return "TIMESTAMP_NTZ"
+    if duck_type in ('BOOLEAN', 'DATE', 'TIME'):
+        return duck_type
+    if duck_type == 'BLOB':
+        return "BINARY"
+    if duck_type.endswith('[]'):
+        return "ARRAY"
+    if duck_type.startswith(('STRUCT', 'MAP')):
+        return "OBJECT"
+    if duck_type == 'JSON':
+        return "VARIANT"
+    return "TEXT"
+
+
+# Same mapping in SQL, for the columns view
+SNOWFLAKE_TYPE_SQL = """CASE
+    WHEN data_type LIKE 'DECIMAL(%' THEN 'NUMBER'
+    WHEN data_type IN ('TINYINT','SMALLINT','INTEGER','BIGINT','HUGEINT','UTINYINT','USMALLINT','UINTEGER','UBIGINT') THEN 'NUMBER'
+    WHEN data_type IN ('FLOAT','DOUBLE') THEN 'FLOAT'
+    WHEN data_type = 'TIMESTAMP WITH TIME ZONE' THEN 'TIMESTAMP_TZ'
+    WHEN data_type LIKE 'TIMESTAMP%' THEN 'TIMESTAMP_NTZ'
+    WHEN data_type IN ('BOOLEAN','DATE','TIME') THEN data_type
+    WHEN data_type = 'BLOB' THEN 'BINARY'
+    WHEN data_type LIKE '%[]' THEN 'ARRAY'
+    WHEN data_type LIKE 'STRUCT%' OR data_type LIKE 'MAP%' THEN 'OBJECT'
+    WHEN data_type = 'JSON' THEN 'VARIANT'
+    ELSE 'TEXT' END"""
+
+
+def information_schema_view(view, database):
+    """A derived table standing in for <database>.INFORMATION_SCHEMA.<view>, with Snowflake's uppercase names"""
+    where = f"upper(database_name) = {literal(database)}"
+    if view == 'tables':
+        return f"""(SELECT upper(database_name) AS table_catalog, upper(schema_name) AS table_schema,
+                upper(table_name) AS table_name, 'BASE TABLE' AS table_type, estimated_size AS row_count,
+                NULL::BIGINT AS bytes, comment
+            FROM duckdb_tables() WHERE {where}
+            UNION ALL
+            SELECT upper(database_name), upper(schema_name), upper(view_name), 'VIEW', NULL, NULL, comment
+            FROM duckdb_views() WHERE NOT internal AND {where})"""
+    if view == 'columns':
+        return f"""(SELECT upper(database_name) AS table_catalog, upper(schema_name) AS table_schema,
+                upper(table_name) AS table_name, upper(column_name) AS column_name, column_index AS ordinal_position,
+                column_default, CASE WHEN is_nullable THEN 'YES' ELSE 'NO' END AS is_nullable,
+                {SNOWFLAKE_TYPE_SQL} AS data_type, character_maximum_length, numeric_precision, numeric_scale, comment
+            FROM duckdb_columns() WHERE {where})"""
+    return f"""(SELECT upper(database_name) AS catalog_name, upper(schema_name) AS schema_name, comment
+            FROM duckdb_schemas() WHERE {where} AND NOT internal
+            UNION ALL SELECT {literal(database)}, 'INFORMATION_SCHEMA', NULL)"""
+
+
+def like(pattern, name):
+    """Snowflake's case-insensitive SHOW ... LIKE"""
+    regex = ''.join('.*' if c == '%' else '.' if c == '_' else re.escape(c) for c in pattern)
+    return re.fullmatch(regex, name, re.I | re.S) is not None
+
+
+def is_gzip(path):
+    with open(path, 'rb') as f:
+        return f.read(2) == b'\x1f\x8b'
+
+
+def link_or_copy(source, target):
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+class Result:
+    """Rows of a statement the emulator answered itself"""
+
+    def __init__(self, columns, rows):
+        self.columns = columns
+        self.rows = rows
+
+
+class Connection:
+    def __init__(self, account=None, user=None, password=None, database=None, schema=None, warehouse=None,
+                 role=None, root=None, **kwargs):
+        self.root = os.path.abspath(root or os.environ.get("SNOWFLAKE_LOCAL_ROOT") or DEFAULT_ROOT)
+        os.makedirs(self.root, exist_ok=True)
+        self.instance = Instance.get(self.root)
+        self.duck = self.instance.duck.cursor()
+        self.lock = threading.Lock()
+        self.database = None
+        self.schema = None
+        self.warehouse = warehouse.upper() if warehouse else "COMPUTE_WH"
+        self.role = role
+        self.user = user
+        self.account = account
+        self._context = None
+        self._owner = None
+        self._temp_tables = 0
+        if database and self.database_exists(identifier(database)):
+            self._use_database(identifier(database))
+        if schema:
+            self.schema = identifier(schema)
+
+    # Context managers and DB-API
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def cursor(self, cursor_class=None):
+        return Cursor(self, dict_rows=cursor_class is DictCursor)
+
+    def close(self):
+        if self.duck is not None:
+            self.duck.close()
+            self.duck = None
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def execute_string(self, sql_text, remove_comments=False, return_cursors=True):
+        cursors = []
+        for statement in sql_text.split(';'):
+            if statement.strip():
+                cursors.append(self.cursor().execute(statement))
+        return cursors
+
+    @property
+    def is_closed(self):
+        return self.duck is None
+
+    # Files below the root
+    def database_path(self, database):
+        return os.path.join(self.root, f"{database}.duckdb")
+
+    def database_exists(self, database):
+        return os.path.exists(self.database_path(database))
+
+    def stage_dir(self, location):
+        """(stage directory, path prefix, stage name) of an @stage[/prefix] location"""
+        location = location.strip().strip("'")[1:]
+        if location.startswith('~'):
+            return os.path.join(self.root, "_stages", "_user"), location[1:].lstrip('/'), "~"
+        match = re.match(rf'%?({QUALIFIED})(?:/(.*))?$', location, re.S)
+        if not match:
+            raise ProgrammingError(f"Invalid stage location: @{location}")
+        parts = split_qualified(match.group(1))
+        database, schema = self._qualify(parts[:-1])
+        name = parts[-1]
+        table_stage = location.startswith('%')
+        stage = os.path.join(self.root, "_stages", database, schema, f"%{name}" if table_stage else name)
+        if not os.path.isdir(stage):
+            if not table_stage:
+                raise ProgrammingError(f"SQL compilation error:\nStage '{database}.{schema}.{name}' does not exist or not authorized.")
+            os.makedirs(stage, exist_ok=True)
+        return stage, match.group(2) or "", name
+
+    def _qualify(self, parts):
+        """Database and schema of a name's leading parts, defaulting to the session's"""
+        if len(parts) == 2:
+            return parts[0], parts[1]
+        database = self.database
+        schema = parts[0] if parts else self.schema
+        if database is None or schema is None:
+            raise ProgrammingError("Cannot perform operation. This session does not have a current database or schema. "
+                                   "Call 'USE DATABASE', or use a qualified name.")
+        return database, schema
+
+    def formats_path(self, database, schema):
+        return os.path.join(self.root, "_formats", f"{database}.{schema}.json")
+
+    def file_format(self, name):
+        parts = split_qualified(name)
+        database, schema = self._qualify(parts[:-1])
+        path = self.formats_path(database, schema)
+        formats = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                formats = json.load(f)
+        if parts[-1] not in formats:
+            raise ProgrammingError(f"SQL compilation error:\nFile format '{parts[-1]}' does not exist or not authorized.")
+        return formats[parts[-1]]
+
+    # DuckDB session state
+    def attach(self, database, create=False):
+        instance = self.instance
+        with instance.lock:
+            if database in instance.attached:
+                return True
+            if not create and not self.database_exists(database):
+                return False
+            self.duck.execute(f"ATTACH {literal(self.database_path(database))} AS {quote(database)}")
+            instance.attached.add(database)
+            return True
+
+    def detach(self, database):
+        instance = self.instance
+        with instance.lock:
+            if database in instance.attached:
+                self.duck.execute("USE memory")
+                self.duck.execute(f"DETACH {quote(database)}")
+                instance.attached.discard(database)
+                instance.generation += 1
+
+    def prepare(self, sql):
+        """Attach the databases `sql` refers to and make DuckDB's current schema the session's"""
+        for match in THREE_PART.finditer(sql):
+            self.attach(identifier(match.group(1)))
+        for match in INFORMATION_SCHEMA.finditer(sql):
+            if match.group(1):
+                self.attach(identifier(match.group(1)))
+        context = (self.database, self.schema, self.instance.generation)
+        if self.database is None or not self.attach(self.database):
+            return
+        if context != self._context:
+            target = quote(self.database)
+            if self.schema and self.duck.execute(
+                    "SELECT 1 FROM duckdb_schemas() WHERE database_name = ? AND upper(schema_name) = ?",
+                    [self.database, self.schema.upper()]).fetchone():
+                target += "." + quote(self.schema)
+            self.duck.execute(f"USE {target}")
+            self._context = context
+
+    def _use_database(self, database):
+        if not self.database_exists(database):
+            raise ProgrammingError(f"Object does not exist, or operation cannot be performed. Database '{database}'")
+        self.database = database
+        self.schema = "PUBLIC"
+
+    def claim(self, cursor):
+        """Results of the connection's DuckDB session belong to one cursor at a time; the previous owner's are fetched first"""
+        if self._owner is not None and self._owner is not cursor:
+            self._owner.materialize()
+        self._owner = cursor
+
+
+class Cursor:
+    def __init__(self, connection, dict_rows=False):
+        self.connection = connection
+        self.dict_rows = dict_rows
+        self.description = None
+        self.rowcount = -1
+        self.arraysize = 1
+        self.sfqid = None
+        self._rows = None
+        self._duck_result = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __iter__(self):
+        row = self.fetchone()
+        while row is not None:
+            yield row
+            row = self.fetchone()
+
+    def close(self):
+        if self.connection._owner is self:
+            self.connection._owner = None
+        self._rows = None
+
+    def execute(self, command, params=None, **kwargs):
+        conn = self.connection
+        if conn.duck is None:
+            raise InterfaceError("Connection is closed")
+        sql = strip_comments(command)
+        if not sql:
+            self._set([], [])
+            return self
+        with conn.lock:
+            conn.claim(self)
+            try:
+                result = Statement(conn, sql, params).run()
+            except duckdb.Error as e:
+                raise ProgrammingError(str(e)) from e
+        if isinstance(result, Result):
+            self._set(result.columns, result.rows)
+        else:
+            self.description = [(name.upper(), type_code, None, None, None, None, True)
+                                for name, type_code, *_ in (conn.duck.description or [])]
+            self._rows = None
+            self._duck_result = True
+            self.rowcount = -1
+        return self
+
+    def executemany(self, command, seqparams, **kwargs):
+        for params in seqparams:
+            self.execute(command, params)
+        return self
+
+    def _set(self, columns, rows):
+        self.description = [(name, None, None, None, None, None, True) for name in columns]
+        self._rows = list(rows)
+        self._duck_result = False
+        self.rowcount = len(self._rows)
+
+    def _duck_fetch(self, method, *args):
+        try:
+            return getattr(self.connection.duck, method)(*args)
+        except duckdb.InvalidInputError:
+            # Statements without a result set
+            return []
+
+    def materialize(self):
+        if self._duck_result:
+            self._rows = self._duck_fetch("fetchall")
+            self._duck_result = False
+            self.rowcount = len(self._rows)
+
+    def _format(self, row):
+        if row is None or not self.dict_rows:
+            return row
+        return dict(zip((col[0] for col in self.description), row))
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def fetchmany(self, size=None):
+        size = size or self.arraysize
+        if self._duck_result and self.connection._owner is self:
+            return [self._format(row) for row in self._duck_fetch("fetchmany", size)]
+        self.materialize()
+        rows, self._rows = (self._rows or [])[:size], (self._rows or [])[size:]
+        return [self._format(row) for row in rows]
+
+    def fetchall(self):
+        if self._duck_result and self.connection._owner is self:
+            rows = self._duck_fetch("fetchall")
+            self._duck_result = False
+        else:
+            self.materialize()
+            rows, self._rows = self._rows or [], []
+        return [self._format(row) for row in rows]
+
+    def fetch_pandas_all(self, **kwargs):
+        import pandas as pd
+
+        columns = [col[0] for col in self.description or []]
+        if self._duck_result and self.connection._owner is self:
+            df = self.connection.duck.df()
+            self._duck_result = False
+            df.columns = columns
+            return df
+        self.materialize()
+        rows, self._rows = self._rows or [], []
+        return pd.DataFrame(rows, columns=columns)
+
+    def fetch_pandas_batches(self, **kwargs):
+        yield self.fetch_pandas_all(**kwargs)
+
+
+class Statement:
+    """One statement: either answered by the emulator or rewritten and run on DuckDB"""
+
+    def __init__(self, conn, sql, params):
+        self.conn = conn
+        self.sql = sql
+        self.params = params
+
+    def run(self):
+        sql = self.sql
+        handlers = [
+            (r'USE\s+(?:(DATABASE|SCHEMA|WAREHOUSE|ROLE|SECONDARY\s+ROLES)\s+)?(.+)', self.use),
+            (r'CREATE\s+(OR\s+REPLACE\s+)?(?:TRANSIENT\s+)?DATABASE\s+(IF\s+NOT\s+EXISTS\s+)?(\S+)(?:\s+CLONE\s+(\S+))?.*', self.create_database),
+            (r'DROP\s+DATABASE\s+(IF\s+EXISTS\s+)?(\S+).*', self.drop_database),
+            (r'SHOW\s+(?:TERSE\s+)?DATABASES(?:\s+LIKE\s+\'([^\']*)\')?.*', self.show_databases),
+            (r'SHOW\s+WAREHOUSES(?:\s+LIKE\s+\'([^\']*)\')?.*', self.show_warehouses),
+            (r'ALTER\s+WAREHOUSE\s+(?:IF\s+EXISTS\s+)?(\S+)\s+(.*)', self.alter_warehouse),
+            (r'(?:ALTER|CREATE)\s+(?:OR\s+REPLACE\s+)?(?:WAREHOUSE|SESSION|ROLE|USER)\b.*', self.noop),
+            (r'(?:GRANT|REVOKE)\b.*', self.noop),
+            (r'CREATE\s+(OR\s+REPLACE\s+)?(?:TEMP(?:ORARY)?\s+)?STAGE\s+(IF\s+NOT\s+EXISTS\s+)?(\S+).*', self.create_stage),
+            (r'DROP\s+STAGE\s+(IF\s+EXISTS\s+)?(\S+).*', self.drop_stage),
+            (r'CREATE\s+(OR\s+(?:REPLACE|ALTER)\s+)?FILE\s+FORMAT\s+(IF\s+NOT\s+EXISTS\s+)?(\S+)(.*)', self.create_file_format),
+            (r'PUT\s+(\'[^\']*\'|\S+)\s+(' + STAGE_LOCATION + r')(.*)', self.put),
+            (r'(?:LIST|LS)\s+(' + STAGE_LOCATION + r')(.*)', self.list),
+            (r'(?:REMOVE|RM)\s+(' + STAGE_LOCATION + r')(.*)', self.remove),
+            (r'COPY\s+INTO\s+(' + QUALIFIED + r')\s*(?:\(([^)]*)\))?\s+FROM\s+(' + STAGE_LOCATION + r')(.*)', self.copy_into),
+            (r'COPY\s+INTO\s+@.*', self.unsupported),
+        ]
+        for pattern, handler in handlers:
+            match = re.fullmatch(pattern, sql, re.I | re.S)
+            if match:
+                return handler(match)
+        return self.passthrough()
+
+    # Session
+    def use(self, match):
+        parts = split_qualified(match.group(2))
+        kind = (match.group(1) or ("SCHEMA" if len(parts) == 2 else "DATABASE")).upper()
+        conn = self.conn
+        if kind == "DATABASE":
+            conn._use_database(parts[0])
+        elif kind == "SCHEMA":
+            if len(parts) == 2:
+                conn._use_database(parts[0])
+            elif conn.database is None:
+                raise ProgrammingError("Cannot perform operation. This session does not have a current database. Call 'USE DATABASE', or use a qualified name.")
+            conn.schema = parts[-1]
+        elif kind == "WAREHOUSE":
+            conn.warehouse = parts[0]
+        elif kind == "ROLE":
+            conn.role = parts[0]
+        return status("Statement executed successfully.")
+
+    def noop(self, match):
+        return status("Statement executed successfully.")
+
+    def unsupported(self, match):
+        raise NotSupportedError(f"Not supported by the local Snowflake emulator: {self.sql[:80]}")
+
+    # Databases
+    def create_database(self, match):
+        conn = self.conn
+        replace, if_not_exists = match.group(1), match.group(2)
+        database = identifier(match.group(3))
+        if conn.database_exists(database):
+            if if_not_exists:
+                return status(f"{database} already exists, statement succeeded.")
+            if not replace:
+                raise ProgrammingError(f"SQL compilation error:\nObject '{database}' already exists.")
+            self._drop(database)
+        path = conn.database_path(database)
+        if match.group(4):
+            source = identifier(match.group(4))
+            if not conn.database_exists(source):
+                raise ProgrammingError(f"Object does not exist, or operation cannot be performed. Database '{source}'")
+            if source in conn.instance.attached:
+                conn.duck.execute(f"CHECKPOINT {quote(source)}")
+            # A clone is a copy of the checkpointed file, so it costs one file copy however many tables there are
+            shutil.copyfile(conn.database_path(source), f"{path}.tmp")
+            os.replace(f"{path}.tmp", path)
+            conn.attach(database)
+        else:
+            conn.attach(database, create=True)
+            conn.duck.execute(f"CREATE SCHEMA IF NOT EXISTS {quote(database)}.PUBLIC")
+        conn.database, conn.schema = database, "PUBLIC"
+        return status(f"Database {database} successfully created.")
+
+    def _drop(self, database):
+        conn = self.conn
+        conn.detach(database)
+        for path in (conn.database_path(database), f"{conn.database_path(database)}.wal"):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree(os.path.join(conn.root, "_stages", database), ignore_errors=True)
+        for path in glob.glob(os.path.join(conn.root, "_formats", f"{glob.escape(database)}.*.json")):
+            os.remove(path)
+        if conn.database == database:
+            conn.database = conn.schema = None
+
+    def drop_database(self, match):
+        database = identifier(match.group(2))
+        if not self.conn.database_exists(database):
+            if match.group(1):
+                return status(f"Drop statement executed successfully ({database} already dropped).")
+            raise ProgrammingError(f"SQL compilation error:\nDatabase '{database}' does not exist or not authorized.")
+        self._drop(database)
+        return status(f"{database} successfully dropped.")
+
+    def show_databases(self, match):
+        names = sorted(name[:-len(".duckdb")] for name in os.listdir(self.conn.root) if name.endswith(".duckdb"))
+        if match.group(1) is not None:
+            names = [name for name in names if like(match.group(1), name)]
+        columns = ["created_on", "name", "is_default", "is_current", "origin", "owner", "comment", "options", "retention_time", "kind"]
+        rows = [(None, name, "N", "Y" if name == self.conn.database else "N", "", self.conn.role or "", "", "", "1", "STANDARD")
+                for name in names]
+        return Result(columns, rows)
+
+    # Warehouses only have a size, kept in a JSON file so WarehousePolicy can read it back
+    def _warehouses(self):
+        path = os.path.join(self.conn.root, "_warehouses.json")
+        warehouses = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                warehouses = json.load(f)
+        warehouses.setdefault(self.conn.warehouse, "X-Small")
+        return path, warehouses
+
+    def show_warehouses(self, match):
+        _, warehouses = self._warehouses()
+        names = sorted(name for name in warehouses if match.group(1) is None or like(match.group(1), name))
+        columns = ["name", "state", "type", "size", "min_cluster_count", "max_cluster_count", "started_clusters", "running", "queued", "is_default", "is_current"]
+        rows = [(name, "STARTED", "STANDARD", warehouses[name], 1, 1, 1, 0, 0, "N", "Y" if name == self.conn.warehouse else "N")
+                for name in names]
+        return Result(columns, rows)
+
+    def alter_warehouse(self, match):
+        path, warehouses = self._warehouses()
+        size = parse_options(match.group(2)).get("WAREHOUSE_SIZE")
+        if size:
+            warehouses[identifier(match.group(1))] = size.replace("_", "-").title()
+            with open(path, 'w') as f:
+                json.dump(warehouses, f, indent=2)
+        return status("Statement executed successfully.")
+
+    # Stages and file formats
+    def create_stage(self, match):
+        parts = split_qualified(match.group(3))
+        database, schema = self.conn._qualify(parts[:-1])
+        stage = os.path.join(self.conn.root, "_stages", database, schema, parts[-1])
+        if os.path.isdir(stage):
+            if match.group(2):
+                return status(f"{parts[-1]} already exists, statement succeeded.")
+            if not match.group(1):
+                raise ProgrammingError(f"SQL compilation error:\nObject '{parts[-1]}' already exists.")
+            shutil.rmtree(stage)
+        os.makedirs(stage)
+        return status(f"Stage area {parts[-1]} successfully created.")
+
+    def drop_stage(self, match):
+        parts = split_qualified(match.group(2))
+        database, schema = self.conn._qualify(parts[:-1])
+        shutil.rmtree(os.path.join(self.conn.root, "_stages", database, schema, parts[-1]), ignore_errors=True)
+        return status(f"{parts[-1]} successfully dropped.")
+
+    def create_file_format(self, match):
+        parts = split_qualified(match.group(3))
+        database, schema = self.conn._qualify(parts[:-1])
+        path = self.conn.formats_path(database, schema)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        formats = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                formats = json.load(f)
+        if parts[-1] in formats and match.group(2):
+            return status(f"{parts[-1]} already exists, statement succeeded.")
+        options = parse_options(match.group(4))
+        options.setdefault("TYPE", "CSV")
+        formats[parts[-1]] = options
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(formats, f, indent=2)
+        os.replace(f"{path}.tmp", path)
+        return status(f"File format {parts[-1]} successfully created.")
+
+    def put(self, match):
+        source = match.group(1).strip("'")
+        source_path = unquote(urlparse(source).path) if source.lower().startswith("file://") else source
+        stage, prefix, _ = self.conn.stage_dir(match.group(2))
+        options = parse_options(match.group(3))
+        auto_compress = options.get("AUTO_COMPRESS", "TRUE") == "TRUE"
+        overwrite = options.get("OVERWRITE", "FALSE") == "TRUE"
+        target_dir = os.path.join(stage, prefix)
+        os.makedirs(target_dir, exist_ok=True)
+
+        files = sorted(path for path in glob.glob(source_path) if os.path.isfile(path))
+        if not files:
+            raise ProgrammingError(f"File doesn't exist: ['{source_path}']")
+        rows = []
+        for path in files:
+            name = os.path.basename(path)
+            target = name
+            # Files are linked as they are; gzip is recognized by its magic bytes when read, so only the name changes
+            if auto_compress and not name.lower().endswith(COMPRESSED):
+                target += ".gz"
+            target_path = os.path.join(target_dir, target)
+            size = os.path.getsize(path)
+            if os.path.exists(target_path) and not overwrite and os.path.getsize(target_path) == size:
+                state = "SKIPPED"
+            else:
+                if os.path.exists(target_path):
+                    os.remove(target_path)
+                link_or_copy(path, target_path)
+                state = "UPLOADED"
+            compression = "GZIP" if target.endswith(".gz") else "NONE"
+            rows.append((name, target, size, size, "NONE" if target != name else compression, compression, state, ""))
+        columns = ["source", "target", "source_size", "target_size", "source_compression", "target_compression", "status", "message"]
+        return Result(columns, rows)
+
+    def staged_files(self, location, options):
+        """(path relative to the stage, absolute path) of the files at `location` matching FILES/PATTERN"""
+        stage, prefix, name = self.conn.stage_dir(location)
+        files = []
+        for dir_path, _, file_names in os.walk(stage):
+            for file_name in file_names:
+                relative = os.path.relpath(os.path.join(dir_path, file_name), stage).replace(os.sep, "/")
+                if relative.startswith(prefix):
+                    files.append((relative, os.path.join(dir_path, file_name)))
+        if options.get("FILES"):
+            wanted = string_list(options["FILES"])
+            wanted = {(prefix.rstrip("/") + "/" + f if prefix else f) for f in wanted}
+            files = [f for f in files if f[0] in wanted]
+        if options.get("PATTERN"):
+            files = [f for f in files if re.fullmatch(options["PATTERN"], f[0])]
+        return sorted(files), name
+
+    def list(self, match):
+        options = parse_options(match.group(2))
+        files, name = self.staged_files(match.group(1), options)
+        label = name.lower() if name != "~" else ""
+        rows = [(f"{label}/{relative}".lstrip("/"), os.path.getsize(path), "", None) for relative, path in files]
+        return Result(["name", "size", "md5", "last_modified"], rows)
+
+    def remove(self, match):
+        files, name = self.staged_files(match.group(1), parse_options(match.group(2)))
+        rows = []
+        for relative, path in files:
+            os.remove(path)
+            rows.append((f"{name.lower()}/{relative}", "removed"))
+        return Result(["name", "result"], rows)
+
+    # Reading staged files
+    def format_options(self, options):
+        file_format = options.get("FILE_FORMAT")
+        if file_format is None:
+            return {"TYPE": "CSV"}
+        if not file_format.startswith("("):
+            return self.conn.file_format(file_format)
+        # An inline (TYPE = ... ) or (FORMAT_NAME = ...)
+        inline = parse_options(file_format[1:-1])
+        if "FORMAT_NAME" in inline:
+            return self.conn.file_format(inline["FORMAT_NAME"])
+        inline.setdefault("TYPE", "CSV")
+        return inline
+
+    def reader(self, path, file_format, all_varchar):
+        """A DuckDB table function reading one staged file the way `file_format` describes it"""
+        kind = file_format.get("TYPE", "CSV")
+        gzip = kind != "PARQUET" and is_gzip(path)
+        if kind == "PARQUET":
+            return f"read_parquet({literal(path)})"
+        if kind == "JSON":
+            compression = "'gzip'" if gzip else "'uncompressed'"
+            json_format = "'array'" if file_format.get("STRIP_OUTER_ARRAY") == "TRUE" else "'auto'"
+            return f"read_json({literal(path)}, format={json_format}, compression={compression}, sample_size=-1)"
+        if kind != "CSV":
+            raise NotSupportedError(f"File format type {kind} is not supported by the local Snowflake emulator")
+        enclosed = file_format.get("FIELD_OPTIONALLY_ENCLOSED_BY", "NONE")
+        quote_char = "" if enclosed == "NONE" else enclosed
+        compression = "'gzip'" if gzip else "'none'"
+        escape = file_format.get("ESCAPE", "NONE")
+        header = file_format.get("PARSE_HEADER") == "TRUE" or int(file_format.get("SKIP_HEADER", 0) or 0) > 0
+        args = [literal(path), f"header={'true' if header else 'false'}",
+                f"delim={literal(file_format.get('FIELD_DELIMITER', ','))}",
+                f"quote={literal(quote_char)}", f"escape={literal(quote_char if escape == 'NONE' else escape)}",
+                f"compression={compression}", "sample_size=-1"]
+        null_if = string_list(file_format["NULL_IF"]) if file_format.get("NULL_IF") else []
+        if null_if:
+            args.append(f"nullstr=[{', '.join(literal(v) for v in null_if + [''])}]")
+        if all_varchar:
+            args.append("all_varchar=true")
+        return f"read_csv({', '.join(args)})"
+
+    def infer_schema(self, match):
+        """Materialize TABLE(INFER_SCHEMA(...)) as a temp table and return its name"""
+        options = parse_options(match.group(1))
+        files, _ = self.staged_files("@" + options["LOCATION"].lstrip("@"), options)
+        if not files:
+            raise ProgrammingError(f"Remote file '{options['LOCATION']}' was not found.")
+        file_format = self.format_options(options)
+        _, path = files[0]
+        described = self.conn.duck.execute(f"DESCRIBE SELECT * FROM {self.reader(path, file_format, False)}").fetchall()
+        rows = []
+        for order, (name, duck_type, *_) in enumerate(described):
+            sf_type = snowflake_type(duck_type)
+            rows.append((name, sf_type, True, f"$1:{quote(name)}::{sf_type}", files[0][0], order))
+        self.conn._temp_tables += 1
+        table = f"__infer_schema_{self.conn._temp_tables}"
+        self.conn.duck.execute(f"""CREATE OR REPLACE TEMP TABLE {table} (COLUMN_NAME VARCHAR, TYPE VARCHAR,
+            NULLABLE BOOLEAN, EXPRESSION VARCHAR, FILENAMES VARCHAR, ORDER_ID INTEGER)""")
+        self.conn.duck.executemany(f"INSERT INTO {table} VALUES (?, ?, ?, ?, ?, ?)", rows)
+        return f"temp.main.{table}"
+
+    def copy_into(self, match):
+        conn = self.conn
+        table = match.group(1)
+        options = parse_options(match.group(4))
+        file_format = self.format_options(options)
+        files, _ = self.staged_files(match.group(3), options)
+        if not files:
+            return Result(["status"], [("Copy executed with 0 files processed.",)])
+        conn.prepare(f"{table}")
+        parts = split_qualified(table)
+        target = ".".join(quote(p) for p in parts) if len(parts) > 1 else quote(parts[0])
+        try:
+            table_columns = [row[0] for row in conn.duck.execute(f"DESCRIBE {target}").fetchall()]
+        except duckdb.Error:
+            raise ProgrammingError(f"SQL compilation error:\nTable '{parts[-1]}' does not exist or not authorized.")
+        listed_columns = [identifier(c) for c in match.group(2).split(",")] if match.group(2) else None
+        match_by_name = options.get("MATCH_BY_COLUMN_NAME", "NONE")
+        on_error = str(options.get("ON_ERROR", "ABORT_STATEMENT")).upper()
+
+        rows = []
+        conn.duck.execute("BEGIN TRANSACTION")
+        try:
+            for relative, path in files:
+                reader = self.reader(path, file_format, True)
+                described = conn.duck.execute(f"DESCRIBE SELECT * FROM {reader}").fetchall()
+                file_columns = [(name, duck_type) for name, duck_type, *_ in described]
+
+                def value(name, duck_type):
+                    # Nested JSON values are stored as JSON text, as Snowflake renders VARIANT
+                    if duck_type.startswith(('STRUCT', 'MAP')) or duck_type.endswith('[]'):
+                        return f"to_json({quote(name)})"
+                    return quote(name)
+
+                if match_by_name != "NONE":
+                    by_name = {(n if match_by_name == "CASE_SENSITIVE" else n.upper()): (n, t) for n, t in file_columns}
+                    pairs = [(column, by_name.get(column if match_by_name == "CASE_SENSITIVE" else column.upper()))
+                             for column in table_columns]
+                    pairs = [(column, source) for column, source in pairs if source]
+                    if not pairs:
+                        raise ProgrammingError("Insert column list does not match column list. No column in the file matches a table column.")
+                    insert_columns = [c for c, _ in pairs]
+                    select = [value(*source) for _, source in pairs]
+                else:
+                    insert_columns = listed_columns or table_columns[:len(file_columns)]
+                    select = [value(*source) for source in file_columns[:len(insert_columns)]]
+                statement = (f"INSERT INTO {target} ({', '.join(quote(c) for c in insert_columns)}) "
+                             f"SELECT {', '.join(select)} FROM {reader}")
+                try:
+                    loaded = conn.duck.execute(statement).fetchone()[0]
+                    rows.append((relative, "LOADED", loaded, loaded, 1, 0, None, None, None, None))
+                except duckdb.Error as e:
+                    if on_error.startswith("ABORT"):
+                        raise ProgrammingError(f"{e}\n  File '{relative}'") from e
+                    rows.append((relative, "LOAD_FAILED", 0, 0, 1, 1, str(e).splitlines()[0], None, None, None))
+            conn.duck.execute("COMMIT")
+        except Exception:
+            conn.duck.execute("ROLLBACK")
+            raise
+        columns = ["file", "status", "rows_parsed", "rows_loaded", "error_limit", "errors_seen", "first_error",
+                   "first_error_line", "first_error_character", "first_error_column_name"]
+        return Result(columns, rows)
+
+    # Everything else
+    def passthrough(self):
+        conn = self.conn
+        sql = INFER_SCHEMA.sub(self.infer_schema, self.sql)
+        conn.prepare(sql)
+
+        def view(match):
+            database = identifier(match.group(1)) if match.group(1) else conn.database
+            if database is None:
+                raise ProgrammingError("Cannot perform SELECT. This session does not have a current database. Call 'USE DATABASE', or use a qualified name.")
+            if not conn.attach(database):
+                raise ProgrammingError(f"SQL compilation error:\nDatabase '{database}' does not exist or not authorized.")
+            return information_schema_view(match.group(2).lower(), database)
+
+        sql = INFORMATION_SCHEMA.sub(view, sql)
+        sql = translate_types(sql)
+        sql, params = translate_params(sql, self.params)
+        if params is None:
+            conn.duck.execute(sql)
+        else:
+            conn.duck.execute(sql, params)
+        return None
+
+
+def status(message):
+    return Result(["status"], [(message,)])
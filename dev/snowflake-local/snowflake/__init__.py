@@ -0,0 +1 @@
+"""Shadows the snowflake package when dev/snowflake-local is on PYTHONPATH; see duckdb_snowflake"""
@@ -0,0 +1,8 @@
+"""snowflake.connector backed by local DuckDB files (dev/snowflake-local/duckdb_snowflake.py)"""
+from duckdb_snowflake import (
+    apilevel, threadsafety, paramstyle, connect, Connection, Cursor, DictCursor,
+    Error, InterfaceError, DatabaseError, ProgrammingError, OperationalError, NotSupportedError,
+)
+
+SnowflakeConnection = Connection
+SnowflakeCursor = Cursor
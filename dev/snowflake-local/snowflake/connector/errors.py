@@ -0,0 +1 @@
+from duckdb_snowflake import Error, InterfaceError, DatabaseError, ProgrammingError, OperationalError, NotSupportedError
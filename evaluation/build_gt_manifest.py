@@ -0,0 +1,165 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'
+except ImportError:
+    CSV_ENGINE = 'c'
+
+CHUNK_SIZE = 1 << 20
+
+
+def read_json(file_path):
+    with open(file_path, 'r') as file:
+        data = json.load(file)
+    return data
+
+
+def count_lines(file_path):
+    """Count newline-terminated lines (plus a trailing unterminated one) by scanning raw bytes"""
+    lines = 0
+    last = b'\n'
+    has_quote = False
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            lines += chunk.count(b'\n')
+            has_quote = has_quote or b'"' in chunk
+            last = chunk[-1:]
+    if last != b'\n':
+        lines += 1
+    return lines, has_quote
+
+
+def count_rows(file_path):
+    """Row count of a CSV/JSONL source file.
+
+    JSONL and unquoted CSV are counted from raw newlines. Quoted CSV may hold embedded
+    newlines, so its count comes from a columnar read instead.
+    """
+    lines, has_quote = count_lines(file_path)
+    if file_path.endswith('.jsonl'):
+        return lines
+    if not has_quote:
+        return max(lines - 1, 0)
+    # The pyarrow engine only takes usecols by name
+    first_column = pd.read_csv(file_path, nrows=0).columns[0]
+    return len(pd.read_csv(file_path, engine=CSV_ENGINE, usecols=[first_column]))
+
+
+def to_builtin(value):
+    """Convert a numpy/pandas scalar to something json can serialise"""
+    if value is None or pd.isna(value):
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, (int, float, bool, str)):
+        return value
+    return str(value)
+
+
+def column_hash(series):
+    """Order-independent hash of a column's values"""
+    hashed = pd.util.hash_pandas_object(series, index=False).sum() & 0xFFFFFFFFFFFFFFFF
+    return f"{int(hashed):016x}"
+
+
+def profile_table(file_path):
+    """Per-column profile of a GT table as eva_stage2 reads it: dtype, nulls, min/max/sum, hash"""
+    df = pd.read_csv(file_path)
+    columns = {}
+    for name in df.columns:
+        series = df[name]
+        column = {'dtype': str(series.dtype), 'nulls': int(series.isna().sum())}
+        non_null = series.dropna()
+        try:
+            column['min'] = to_builtin(non_null.min()) if len(non_null) else None
+            column['max'] = to_builtin(non_null.max()) if len(non_null) else None
+        except TypeError:
+            # mixed-type object columns have no ordering
+            column['min'] = column['max'] = None
+        if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+            column['sum'] = to_builtin(non_null.sum())
+        column['hash'] = column_hash(series)
+        columns[name] = column
+
+    digest = hashlib.sha256()
+    for name in df.columns:
+        digest.update(f"{name}:{columns[name]['hash']};".encode())
+    return {'rows': len(df), 'columns': columns, 'hash': digest.hexdigest()}
+
+
+def scan_source(task):
+    db, table, file_path = task
+    return 'source', db, table, count_rows(file_path)
+
+
+def scan_gt(task):
+    db, table, file_path = task
+    return 'gt', db, table, profile_table(file_path)
+
+
+def list_tables(root, db):
+    """(db, table, path) for every CSV/JSONL file in <root>/<db>"""
+    folder = os.path.join(root, db)
+    if not os.path.isdir(folder):
+        return []
+    tasks = []
+    for file in sorted(os.listdir(folder)):
+        if file.endswith(('.csv', '.jsonl')):
+            tasks.append((db, file.split('.')[0], os.path.join(folder, file)))
+    return tasks
+
+
+def build_manifest(databases, source_roots, gt_root, jobs):
+    """Scan source and GT files in a process pool; returns (table_counts, gt_profiles)"""
+    source_tasks = [t for db in databases for root in source_roots for t in list_tables(root, db)]
+    gt_tasks = [t for db in databases for t in list_tables(gt_root, db)]
+
+    table_counts = {}
+    gt_profiles = {}
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        results = list(pool.map(scan_source, source_tasks, chunksize=4)) + list(pool.map(scan_gt, gt_tasks))
+    for kind, db, table, value in results:
+        if kind == 'source':
+            table_counts.setdefault(db, {})[table] = value
+        else:
+            gt_profiles.setdefault(db, {})[table] = value
+        print(f"{kind}: {db}.{table}", flush=True)
+    return table_counts, gt_profiles
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build table.json and GT column profiles from data/")
+    parser.add_argument("--data", type=str, default="../data", help="Data directory holding source/ and gt/")
+    parser.add_argument("--table_json", type=str, default="./table.json", help="Expected row counts, merged into the existing file")
+    parser.add_argument("--profile", type=str, default="./gt_profile.json", help="Per-table GT column profiles")
+    parser.add_argument("--jobs", "-j", type=int, default=os.cpu_count(), help="Number of worker processes")
+    args = parser.parse_args()
+
+    databases = sorted(f.name for f in os.scandir('../elt-bench') if f.is_dir())
+    source_roots = [os.path.join(args.data, 'source', 'db', 'data'), os.path.join(args.data, 'source', 'api', 'data')]
+    table_counts, gt_profiles = build_manifest(databases, source_roots, os.path.join(args.data, 'gt'), args.jobs)
+
+    # Flat files are downloaded at load time and never land in data/source, so their
+    # hand-maintained counts are kept.
+    table_list = read_json(args.table_json) if os.path.exists(args.table_json) else {}
+    for db, tables in table_counts.items():
+        expected = table_list.setdefault(db, {})
+        existing_keys = {key.upper(): key for key in expected}
+        for table, rows in tables.items():
+            expected[existing_keys.get(table.upper(), table)] = rows
+
+    with open(args.table_json, 'w') as f:
+        json.dump(table_list, f, indent=4)
+    with open(args.profile, 'w') as f:
+        json.dump(gt_profiles, f, indent=2)
+    print(f"Wrote {args.table_json} and {args.profile}", flush=True)
@@ -1,8 +1,14 @@
 import json
 import os
+import sys
 import argparse
+from contextlib import nullcontext
+import snowflake.connector
 from eva_stage1 import evaluate_stage1
 from eva_stage2 import evaluate_stage2
+from eva_dbt import evaluate_stage1_artifacts
+sys.path.insert(0, '../dev/snowflake-connector')
+from warehouse_policy import WarehousePolicy
 
 def read_json(file_path):
     with open(file_path, 'r') as file:
@@ -14,10 +20,27 @@ SNOWFLAKE_CONFIG = read_json(file_path)
 parser = argparse.ArgumentParser(description="agent")
 parser.add_argument("--folder", type=str, required=True, help='Specify the folder name where you want to store the results.')
 parser.add_argument("--example_index", "-i", type=str, default="all", help="index range of the examples to run, e.g., '0-10', '2,3', 'all'")
+parser.add_argument("--dbt_output", type=str, default=None, help="Agent output directory holding one <db>/ run per database; stage 1 then reads dbt artifacts instead of querying Snowflake.")
+parser.add_argument("--warehouse_policy", type=str, default=None, help="JSON policy resizing the warehouse per phase, e.g. ../setup/destination/warehouse_policy.json; stage 2 runs under its 'stage2' size.")
+parser.add_argument("--warehouse_timings", type=str, default="../data/warehouse_timings.jsonl", help="Where the resized stage 2 appends its size and duration")
 
 args = parser.parse_args()
 
 os.makedirs(f'../data/results/{args.folder}', exist_ok=True)
 
-evaluate_stage1(args.folder, args.example_index, SNOWFLAKE_CONFIG)
-evaluate_stage2(args.folder, args.example_index, SNOWFLAKE_CONFIG)
\ No newline at end of file
+if args.dbt_output:
+    evaluate_stage1_artifacts(args.folder, args.example_index, args.dbt_output, SNOWFLAKE_CONFIG)
+else:
+    evaluate_stage1(args.folder, args.example_index, SNOWFLAKE_CONFIG)
+
+policy_conn = snowflake.connector.connect(**SNOWFLAKE_CONFIG) if args.warehouse_policy else None
+if policy_conn:
+    stage2_phase = WarehousePolicy.from_file(args.warehouse_policy, policy_conn, args.warehouse_timings).phase("stage2")
+else:
+    stage2_phase = nullcontext()
+try:
+    with stage2_phase:
+        evaluate_stage2(args.folder, args.example_index, SNOWFLAKE_CONFIG)
+finally:
+    if policy_conn:
+        policy_conn.close()
\ No newline at end of file
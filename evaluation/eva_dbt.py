@@ -0,0 +1,150 @@
+import json
+import os
+import snowflake.connector
+from eva_stage1 import filter_databases, read_json, write_message
+from build_gt_manifest import count_rows
+
+GT_PROFILE = './gt_profile.json'
+# dbt-snowflake's rows_affected is a row count only for DML; a table (CTAS) or view reports "SUCCESS 1"
+ROW_COUNT_MATERIALIZATIONS = ('incremental',)
+
+
+def find_dbt_targets(run_dir):
+    """Return every dbt `target/` directory under an agent run's output directory"""
+    targets = []
+    for root, dirs, files in os.walk(run_dir):
+        if os.path.basename(root) == 'target' and 'run_results.json' in files:
+            targets.append(root)
+    targets.sort()
+    return targets
+
+
+def read_dbt_artifacts(target_dir):
+    """Read run_results.json (and manifest.json if present) into per-model build records.
+
+    Returns {model_name: {status, rows_affected, execution_time, timing, materialized, relation}},
+    keyed by the uppercased model alias so it matches how Snowflake stores the table.
+    """
+    run_results = read_json(os.path.join(target_dir, 'run_results.json'))
+    manifest_path = os.path.join(target_dir, 'manifest.json')
+    nodes = read_json(manifest_path).get('nodes', {}) if os.path.exists(manifest_path) else {}
+
+    models = {}
+    for result in run_results.get('results', []):
+        unique_id = result.get('unique_id', '')
+        if not unique_id.startswith('model.'):
+            continue
+        node = nodes.get(unique_id, {})
+        name = node.get('alias') or node.get('name') or unique_id.split('.')[-1]
+        adapter_response = result.get('adapter_response') or {}
+        timing = {}
+        for phase in result.get('timing', []):
+            timing[phase['name']] = {'started_at': phase.get('started_at'), 'completed_at': phase.get('completed_at')}
+        models[name.upper()] = {
+            'unique_id': unique_id,
+            'status': result.get('status'),
+            'rows_affected': adapter_response.get('rows_affected'),
+            'execution_time': result.get('execution_time'),
+            'timing': timing,
+            'materialized': node.get('config', {}).get('materialized'),
+            'relation': node.get('relation_name'),
+        }
+    return models
+
+
+def collect_run_models(run_dir):
+    """Merge the models of every dbt project in a run; later `dbt run`s override earlier ones"""
+    models = {}
+    for target_dir in find_dbt_targets(run_dir):
+        models.update(read_dbt_artifacts(target_dir))
+    return models
+
+
+def expected_rows(db, model, gt_profiles):
+    """Ground-truth row count of a graded model: from gt_profile.json when it has the table, else counted from the GT CSV"""
+    profile = gt_profiles.get(db, {}).get(model)
+    if profile is not None:
+        return profile['rows']
+    gt_path = f'../data/gt/{db}/{model}.csv'
+    return count_rows(gt_path) if os.path.exists(gt_path) else None
+
+
+def count_relation(relation, snowflake_config):
+    conn = snowflake.connector.connect(**snowflake_config)
+    cursor = conn.cursor()
+    cursor.execute(f"select count(*) from {relation};")
+    result = cursor.fetchall()
+    cursor.close()
+    conn.close()
+    return result[0][0]
+
+
+def built_rows(record, snowflake_config):
+    """Row count of a built model: COUNT(*) on its relation when Snowflake is configured,
+    else rows_affected for materializations where that is a row count, else None"""
+    if snowflake_config and record['relation']:
+        return count_relation(record['relation'], snowflake_config)
+    if record['materialized'] in ROW_COUNT_MATERIALIZATIONS:
+        return record['rows_affected']
+    return None
+
+
+def evaluate_stage1_artifacts(folder, example_index, dbt_output, snowflake_config=None):
+    """Stage 1 from dbt artifacts instead of Snowflake queries.
+
+    For every database, the models graded in stage 2 (evaluation/<db>/*.sql) are looked up
+    in the run's dbt artifacts under <dbt_output>/<db>. A model that built must also have as
+    many rows as its ground truth, as stage 1 checks table sizes: counted in Snowflake when
+    `snowflake_config` is given, else taken from rows_affected of incremental models. Models
+    whose size cannot be known this way are noted but not failed. The verdict is written to
+    results.log in the same Success/Error format as evaluate_stage1, and per-model build
+    latency is recorded in dbt_metrics.json.
+    """
+    log_file = f'../data/results/{folder}/results.log'
+    metrics_file = f'../data/results/{folder}/dbt_metrics.json'
+
+    databases = [f.name for f in os.scandir('../elt-bench') if f.is_dir()]
+    databases.sort()
+    databases = filter_databases(databases, example_index)
+
+    metrics = read_json(metrics_file) if os.path.exists(metrics_file) else {}
+    gt_profiles = read_json(GT_PROFILE) if os.path.exists(GT_PROFILE) else {}
+    for db in databases:
+        expected = sorted(f.name.split('.')[0] for f in os.scandir(f'./{db}') if f.is_file() and f.name.endswith('.sql'))
+        models = collect_run_models(os.path.join(dbt_output, db))
+
+        success_models = []
+        not_built_models = []
+        failed_models = []
+        incorrect_size_tables = []
+        for model in expected:
+            record = models.get(model.upper())
+            if record is None:
+                not_built_models.append(model)
+            elif record['status'] != 'success':
+                failed_models.append(model)
+            else:
+                rows = built_rows(record, snowflake_config)
+                gt_rows = expected_rows(db, model, gt_profiles)
+                if rows is None or gt_rows is None:
+                    write_message(f"{db}.{model} row count not verified (materialized: {record['materialized']}, rows_affected: {record['rows_affected']}, expected: {gt_rows})", log_file)
+                    success_models.append(model)
+                elif rows != gt_rows:
+                    incorrect_size_tables.append(model)
+                    write_message(f"{db}.{model} has {rows} rows, expected {gt_rows} rows", log_file)
+                else:
+                    success_models.append(model)
+
+        if len(not_built_models) == 0 and len(failed_models) == 0 and len(incorrect_size_tables) == 0:
+            write_message(f"Success: {db} models built. Success tables: {success_models}", log_file)
+        else:
+            write_message(f"Error: {db} Successful table: {success_models}  Not_found_table: {not_built_models}, Failed_models: {failed_models}, Incorrect_size_tables: {incorrect_size_tables}", log_file)
+
+        metrics[db] = {
+            'models': models,
+            'total_execution_time': sum(m['execution_time'] or 0 for m in models.values()),
+        }
+        print(db)
+
+    with open(metrics_file, 'w') as f:
+        json.dump(metrics, f, indent=2)
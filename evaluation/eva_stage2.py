@@ -3,6 +3,7 @@ import pandas as pd
 import os
 import numpy as np
 import json
+import re
 import argparse
 
 def read_json(file_path):
@@ -13,12 +14,7 @@ def read_json(file_path):
 file_path = '../setup/destination/snowflake_credential.json' 
 SNOWFLAKE_CONFIG = read_json(file_path)
 
-parser = argparse.ArgumentParser(description="agent")
-parser.add_argument("--folder", type=str, required=True, help='Specify the folder name where you want to store the results.')
-parser.add_argument("--example_index", "-i", type=str, default="all", help="index range of the examples to run, e.g., '0-10', '2,3', 'all'")
-args = parser.parse_args()
-
-def check_corretness(df_gt, df):
+def check_corretness(df_gt, df, folder):
 
     matched_cols = []
     unmatched_cols = []
@@ -50,7 +46,7 @@ def check_corretness(df_gt, df):
         else:
             missed_cols.append(gold_col)
 
-    with open(f'../data/results/{args.folder}/stage2.log', 'a') as f:
+    with open(f'../data/results/{folder}/stage2.log', 'a') as f:
         f.write(f"Matched columns: {matched_cols}\n")
         f.write(f"Unmatched columns: {unmatched_cols}\n")
         f.write(f"Missed: {missed_cols}\n\n\n")
@@ -77,6 +73,45 @@ def filter_databases(databases, example_index):
     except ValueError:
         return databases
 
+SELECT_STAR_PATTERN = re.compile(
+    r"^\s*select\s+\*\s+from\s+(\w+)\.(\w+)\.(\w+)\s*(order\s+by\s+.*?)?\s*;?\s*$",
+    re.IGNORECASE | re.DOTALL)
+
+
+def target_columns(conn, db, schema, table):
+    """Return the column names of a target table from information_schema"""
+    cursor = conn.cursor()
+    cursor.execute(
+        f"SELECT column_name FROM {db}.information_schema.columns "
+        "WHERE table_schema = %s AND table_name = %s ORDER BY ordinal_position",
+        (schema.upper(), table.upper()))
+    columns = [x[0] for x in cursor.fetchall()]
+    cursor.close()
+    return columns
+
+
+def project_query(query, conn, gt_columns):
+    """Rewrite `select * from <db>.<schema>.<table>` to select only the graded columns.
+
+    Only GT columns (matched case-insensitively) that exist in the target are kept,
+    under their target names, so check_corretness sees the same frame minus the
+    extra columns. Queries of any other shape are returned unchanged.
+    """
+    match = SELECT_STAR_PATTERN.match(query)
+    if not match:
+        return query
+    db, schema, table, order_by = match.groups()
+    wanted = {col.upper() for col in gt_columns}
+    columns = [col for col in target_columns(conn, db, schema, table) if col.upper() in wanted]
+    if not columns:
+        return query
+    select_list = ", ".join(f'"{col}"' for col in columns)
+    projected = f"select {select_list} from {db}.{schema}.{table}"
+    if order_by:
+        projected += f"\n{order_by}"
+    return projected
+
+
 def evaluate_stage2(folder, example_index, snowflake_config):
     # databases = []
     # with open(f'../data/results/{folder}/results.log', 'r') as f:
@@ -103,13 +138,26 @@ def evaluate_stage2(folder, example_index, snowflake_config):
                     conn = snowflake.connector.connect(**snowflake_config)
                     with open(f'./{db}/{table}.sql', 'r') as f:
                         query = f.read()
+                    gt_columns = pd.read_csv(f'../data/gt/{db}/{table}.csv', nrows=0).columns
+                    query = project_query(query, conn, gt_columns)
                     df = pd.read_sql(query, conn)
                     os.makedirs(f'../data/results/{folder}/{db}', exist_ok=True)
                     df.to_csv(f'../data/results/{folder}/{db}/{table}.csv', index=False)
                     conn.close()
                 df = pd.read_csv(f'../data/results/{folder}/{db}/{table}.csv')
                 df_gt = pd.read_csv(f'../data/gt/{db}/{table}.csv')
-                check_corretness(df_gt, df)
+                check_corretness(df_gt, df, folder)
             except Exception as e:
                 with open(f'../data/results/{folder}/stage2.log', 'a') as f:
                     f.write(f'Error: {e}\n\n\n')
+
+
+if __name__ == "__main__":
+    # Parsed only when run directly: eva.py imports evaluate_stage2 and has options of its own
+    parser = argparse.ArgumentParser(description="agent")
+    parser.add_argument("--folder", type=str, required=True, help='Specify the folder name where you want to store the results.')
+    parser.add_argument("--example_index", "-i", type=str, default="all", help="index range of the examples to run, e.g., '0-10', '2,3', 'all'")
+    args = parser.parse_args()
+
+    os.makedirs(f'../data/results/{args.folder}', exist_ok=True)
+    evaluate_stage2(args.folder, args.example_index, SNOWFLAKE_CONFIG)
@@ -1,10 +1,4 @@
-DB_DIR="./sources"
-db_names=($(ls "$DB_DIR" | head -n 100))
-# db_names=($(ls "$DB_DIR" | tail -n +50 | head -n 50))
-cd ./sources
-for table_name in "${db_names[@]}"; do
-  cd ./$table_name
-  bash data.sh $1
-  cd ..
-  echo "Databases Created: $table_name"
-done
\ No newline at end of file
+# Provisions every source in ./sources (S3 objects on localstack, Postgres tables) in parallel,
+# following each source's data.sh/postgres.sh; per-source timings go to provision_report.json.
+# Pass e.g. --sources address,airline to provision a subset.
+python3 provision_sources.py --path "$1" "${@:2}"
@@ -4,19 +4,10 @@
 #conda install -y python=3.11
 #pip install -r requirements.txt
 
-#Download the data used in the benchmark
-gdown 'https://drive.google.com/uc?id=1qVAzU3kgn_G72QQ4b5zt3e1hwkQcSgDq' 
-gdown 'https://drive.google.com/uc?id=1-Gv5g_Yg_YrR-NxH4s2tSEK3VhJQc2Q0'
-gdown 'https://drive.google.com/uc?id=11vQqNEWXoPG6sjKytAn7TtFLDMiQa17I'
-
-#Create the necessary folders
-mkdir -p ../data/source/api
-mkdir -p ../data/source/db
-
-#Unzip the data used in the benchmark
-unzip data_api.zip -d ../data/source/api
-unzip data_db.zip -d ../data/source/db
-unzip gt.zip -d ../data
+#Download the data used in the benchmark (cached and checksum-verified in ../data/cache/archives,
+#see archives.json) and extract it into ../data/source/api, ../data/source/db and ../data/gt.
+#Rerunning skips unchanged downloads and resumes an interrupted extraction.
+python3 fetch_archives.py
 
 docker network create -d bridge elt-docker_elt_network
 
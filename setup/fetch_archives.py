@@ -0,0 +1,188 @@
+import os
+import json
+import shutil
+import hashlib
+import argparse
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+try:
+    import gdown
+except ImportError:
+    gdown = None
+
+CHUNK_SIZE = 1 << 20
+
+
+def file_sha256(file_path):
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_crc32(file_path):
+    crc = 0
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+class ArchiveCache:
+    """Downloaded archives stored once under objects/<sha256>.
+
+    index.json maps each URL to the name and sha256 of what it served. A URL is only
+    downloaded again if its object is missing or no longer matches the recorded (or
+    pinned) checksum. Archives without a pin in archives.json are only checked against what
+    was recorded when they were first downloaded. URLs may also be local paths or file://
+    URLs, e.g. fixture archives.
+    """
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        os.makedirs(os.path.join(cache_dir, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(cache_dir, 'partial'), exist_ok=True)
+        self.index = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r') as f:
+                self.index = json.load(f)
+
+    def object_path(self, sha256):
+        return os.path.join(self.cache_dir, 'objects', sha256)
+
+    def save_index(self):
+        with open(f"{self.index_path}.tmp", 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(f"{self.index_path}.tmp", self.index_path)
+
+    def cached(self, url, pinned=None):
+        """(name, object path) if a verified copy of `url` is cached, else None"""
+        entry = self.index.get(url)
+        if not entry or (pinned and entry['sha256'] != pinned):
+            return None
+        path = self.object_path(entry['sha256'])
+        if not os.path.exists(path) or file_sha256(path) != entry['sha256']:
+            return None
+        return entry['name'], path
+
+    def download(self, url):
+        """Fetch `url` into partial/; returns the local file path"""
+        parsed = urlparse(url)
+        if parsed.scheme in ('', 'file'):
+            source = parsed.path if parsed.scheme else url
+            target = os.path.join(self.cache_dir, 'partial', os.path.basename(source))
+            shutil.copyfile(source, target)
+            return target
+        if gdown is None:
+            raise RuntimeError("gdown is not installed; pip install gdown")
+        # A trailing separator makes gdown keep the file's own name; resume continues a partial download
+        return gdown.download(url, os.path.join(self.cache_dir, 'partial') + os.sep, quiet=False, resume=True)
+
+    def fetch(self, url, pinned_by_name):
+        """Return (archive name, verified object path), downloading only when needed"""
+        entry = self.index.get(url)
+        hit = self.cached(url, pinned_by_name.get(entry['name']) if entry else None)
+        if hit:
+            print(f"Cached: {hit[0]} ({url})", flush=True)
+            return hit
+
+        path = self.download(url)
+        name = os.path.basename(path)
+        sha256 = file_sha256(path)
+        pinned = pinned_by_name.get(name)
+        if pinned and pinned != sha256:
+            os.remove(path)
+            raise RuntimeError(f"Checksum mismatch for {name}: expected {pinned}, got {sha256}")
+        if not pinned:
+            print(f"No pinned sha256 for {name} in the spec; the download is not verified", flush=True)
+        os.replace(path, self.object_path(sha256))
+        self.index[url] = {'name': name, 'sha256': sha256}
+        self.save_index()
+        print(f"Downloaded: {name} sha256={sha256}", flush=True)
+        return name, self.object_path(sha256)
+
+
+def extract(archive_path, dest, sha256, workers):
+    """Extract a zip archive with its members spread over threads; returns (written, skipped), or None if already done.
+
+    Each member is written to a .part file and renamed when complete, and members already
+    present with the right size and CRC-32 are skipped, so rerunning after an interruption
+    only extracts what is missing, and a re-published archive rewrites every changed file.
+    A marker per archive checksum skips finished archives outright.
+    """
+    os.makedirs(dest, exist_ok=True)
+    marker = os.path.join(dest, f".{sha256[:16]}.extracted")
+    if os.path.exists(marker):
+        return None
+    root = os.path.realpath(dest)
+
+    local = threading.local()
+    handles = []
+
+    def extract_member(info):
+        target = os.path.realpath(os.path.join(dest, info.filename))
+        if not target.startswith(root + os.sep):
+            raise RuntimeError(f"Refusing to extract {info.filename} outside {dest}")
+        if info.is_dir():
+            os.makedirs(target, exist_ok=True)
+            return False
+        if (os.path.exists(target) and os.path.getsize(target) == info.file_size
+                and file_crc32(target) == info.CRC):
+            return False
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # zlib releases the GIL while inflating, so threads decompress in parallel;
+        # each thread reads through its own handle
+        if not hasattr(local, 'zip'):
+            local.zip = zipfile.ZipFile(archive_path)
+            handles.append(local.zip)
+        with local.zip.open(info) as src, open(f"{target}.part", 'wb') as dst:
+            shutil.copyfileobj(src, dst, CHUNK_SIZE)
+        os.replace(f"{target}.part", target)
+        return True
+
+    with zipfile.ZipFile(archive_path) as archive:
+        members = sorted(archive.infolist(), key=lambda info: info.file_size, reverse=True)
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            extracted = sum(pool.map(extract_member, members))
+    finally:
+        for handle in handles:
+            handle.close()
+    open(marker, 'w').close()
+    return extracted, len(members) - extracted
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download (with a checksum-verified cache) and extract the benchmark archives")
+    parser.add_argument("--spec", type=str, default="./archives.json", help="Archive URLs, pinned sha256 per archive name and extraction targets")
+    parser.add_argument("--cache", type=str, default="../data/cache/archives", help="Content-addressed archive cache")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Threads extracting members of an archive")
+    args = parser.parse_args()
+
+    with open(args.spec, 'r') as f:
+        spec = json.load(f)
+
+    cache = ArchiveCache(args.cache)
+    for url in spec['urls']:
+        name, path = cache.fetch(url, spec.get('sha256', {}))
+        dest = spec['extract'].get(name)
+        if dest is None:
+            print(f"No extraction target for {name}, kept in the cache only", flush=True)
+            continue
+        counts = extract(path, dest, cache.index[url]['sha256'], args.workers)
+        if counts is None:
+            print(f"Already extracted: {name}", flush=True)
+        else:
+            print(f"Extracted {name} to {dest}: {counts[0]} files written, {counts[1]} already present", flush=True)
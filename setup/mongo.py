@@ -1,33 +1,89 @@
 import pandas as pd
-from pymongo import MongoClient
-import math
+import numpy as np
 import json
 import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
 
-parser = argparse.ArgumentParser(description="Data path")
-parser.add_argument("--path", type=str, default=".", help="Data path")
-args = parser.parse_args()
+try:
+  from pymongo import MongoClient
+except ImportError:
+  MongoClient = None
 
-host='localhost'
-port=27017
 
-mongo_uri = f"mongodb://{host}:{port}/?directConnection=true&serverSelectionTimeoutMS=2000"
-client = MongoClient(mongo_uri)
+def documents(chunk):
+  """Records of a chunk without their null fields.
 
-mongo_dbs = json.load(open('mongo.jsonl'))
-for db, tables in mongo_dbs.items():
-  client.drop_database(db)
-  mg_db = client[db]
-  for table in tables:
-    df = pd.read_csv(f'{args.path}/data/{db}/{table}.csv')
+  Only the null cells are visited: their positions come from one isna() over the
+  columns that have nulls at all, instead of a check per cell.
+  """
+  records = chunk.to_dict(orient='records')
+  null_columns = chunk.columns[chunk.isna().any().to_numpy()]
+  if len(null_columns):
+    rows, cols = np.nonzero(chunk[null_columns].isna().to_numpy())
+    for row, col in zip(rows, cols):
+      del records[row][null_columns[col]]
+  return records
 
-    df = df.where(pd.notnull(df), None)
-    collection = mg_db[table]
-    data = df.to_dict(orient='records')
-    cleaned_data = []
-    for row in data:
-      cleaned_data.append({k: v for k, v in row.items() if v is not None and not (isinstance(v, float) and math.isnan(float(v)))})
-    collection.insert_many(cleaned_data)
-  print(f'{db} inserted successfully')
 
+def seed_collection(collection, csv_path, batch_size):
+  """Stream a CSV into a collection in unordered insert_many batches of `batch_size` rows; returns the row count.
 
+  Chunks are typed independently, so an integer column with a null (or a decimal) in a
+  later chunk would be stored as int in some documents and as double in others. Once a
+  column has been float in a chunk, later chunks store it as double, and after the single
+  pass the documents earlier chunks stored as int are converted, as a whole-file read typed them.
+  """
+  rows = 0
+  as_float = set()
+  inserted_as_int = set()
+  for chunk in pd.read_csv(csv_path, chunksize=batch_size):
+    as_float.update(chunk.columns[[dtype.kind == 'f' for dtype in chunk.dtypes]])
+    cast = [column for column in as_float if chunk[column].dtype.kind in 'iu']
+    if cast:
+      chunk = chunk.astype({column: 'float64' for column in cast})
+    inserted_as_int.update(chunk.columns[[dtype.kind in 'iu' for dtype in chunk.dtypes]])
+    docs = documents(chunk)
+    if docs:
+      collection.insert_many(docs, ordered=False)
+    rows += len(docs)
+
+  for column in sorted(inserted_as_int & as_float):
+    collection.update_many({'$or': [{column: {'$type': 'int'}}, {column: {'$type': 'long'}}]},
+                           [{'$set': {column: {'$multiply': [f'${column}', 1.0]}}}])
+  return rows
+
+
+def seed(client, mongo_dbs, path, batch_size=10000, workers=8):
+  """Drop and reseed every database listed in mongo.jsonl, loading collections concurrently"""
+  for db in mongo_dbs:
+    client.drop_database(db)
+
+  def load(db, table):
+    started = time.monotonic()
+    rows = seed_collection(client[db][table], f'{path}/data/{db}/{table}.csv', batch_size)
+    return db, table, rows, time.monotonic() - started
+
+  with ThreadPoolExecutor(max_workers=workers) as pool:
+    futures = [pool.submit(load, db, table) for db, tables in mongo_dbs.items() for table in tables]
+    for future in futures:
+      db, table, rows, seconds = future.result()
+      print(f'{db}.{table}: {rows} documents inserted in {seconds:.1f}s', flush=True)
+
+
+if __name__ == "__main__":
+  parser = argparse.ArgumentParser(description="Data path")
+  parser.add_argument("--path", type=str, default=".", help="Data path")
+  parser.add_argument("--uri", type=str, default="mongodb://localhost:27017/?directConnection=true&serverSelectionTimeoutMS=2000", help="MongoDB connection string")
+  parser.add_argument("--batch_size", type=int, default=10000, help="Rows read and inserted per insert_many batch")
+  parser.add_argument("--workers", type=int, default=8, help="Collections seeded concurrently")
+  args = parser.parse_args()
+
+  if MongoClient is None:
+    raise RuntimeError("pymongo is not installed; pip install pymongo")
+  client = MongoClient(args.uri)
+
+  mongo_dbs = json.load(open('mongo.jsonl'))
+  started = time.monotonic()
+  seed(client, mongo_dbs, args.path, args.batch_size, args.workers)
+  print(f'Seeded {sum(len(tables) for tables in mongo_dbs.values())} collections in {time.monotonic() - started:.1f}s', flush=True)
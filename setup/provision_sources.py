@@ -0,0 +1,241 @@
+import os
+import re
+import json
+import time
+import argparse
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import psycopg2
+    from psycopg2.pool import ThreadedConnectionPool
+except ImportError:
+    psycopg2 = None
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+SOURCES_DIR = './sources'
+
+ASSIGNMENT = re.compile(r'^(?:export\s+)?(\w+)=(?:"([^"]*)"|\'([^\']*)\'|(\S*))\s*(?:#.*)?$', re.M)
+VARIABLE = re.compile(r'\$\{?(\w+)\}?')
+PSQL_COMMAND = re.compile(r'psql(?P<args>[^\n]*?)-c\s+(?:"(?P<dq>(?:[^"\\]|\\.)*)"|\'(?P<sq>[^\']*)\')', re.S)
+META_COPY = re.compile(r"^\s*\\copy\s+(?P<target>.+?)\s+from\s+'(?P<path>[^']+)'\s*(?P<options>.*?);?\s*$", re.I | re.S)
+S3_COMMAND = re.compile(r'^aws\s.*?\bs3\s+(?P<op>mb|cp|ls)\s+(?P<args>.*)$', re.M)
+
+
+def shell_variables(text, data_path):
+    """Variables assigned (or exported) in a source script, with $1 standing for the data path"""
+    variables = {"1": data_path}
+    for name, double_quoted, single_quoted, bare in ASSIGNMENT.findall(text):
+        variables[name] = single_quoted or expand(double_quoted or bare, variables)
+    return variables
+
+
+def expand(text, variables):
+    return VARIABLE.sub(lambda m: variables.get(m.group(1), m.group(0)), text)
+
+
+def parse_postgres(script_path, data_path):
+    """Connection settings and psql steps of a postgres.sh.
+
+    Every `psql -c` becomes ("sql", database or None, statement), except `\\copy ... FROM 'file'`,
+    which becomes ("copy", database, "COPY ... FROM STDIN ...", file) so that the file can be
+    streamed by the client instead of through psql.
+    """
+    with open(script_path, 'r') as f:
+        text = f.read()
+    variables = shell_variables(text, data_path)
+    steps = []
+    for match in PSQL_COMMAND.finditer(text):
+        database = re.search(r'-d\s+(\S+)', match.group('args'))
+        database = expand(database.group(1), variables) if database else None
+        if match.group('dq') is not None:
+            # Inside double quotes the shell expands variables and drops the backslash of \" \\ \$
+            statement = re.sub(r'\\(["\\$`])', r'\1', expand(match.group('dq'), variables))
+        else:
+            statement = match.group('sq')
+        copy = META_COPY.match(statement)
+        if copy:
+            steps.append(("copy", database, f"COPY {copy.group('target')} FROM STDIN {copy.group('options')}", copy.group('path')))
+        else:
+            steps.append(("sql", database, statement, None))
+    connection = {
+        "host": variables.get("HOST", "localhost"),
+        "port": int(variables.get("DB_PORT", 5432)),
+        "user": variables.get("DB_USER", "postgres"),
+        "password": variables.get("DB_PASSWORD", ""),
+    }
+    return {"database": variables.get("DB_NAME"), "connection": connection, "steps": steps}
+
+
+def parse_source(source_dir, data_path):
+    """Buckets, S3 uploads and Postgres steps that a source's data.sh (and the postgres.sh it runs) would perform"""
+    with open(os.path.join(source_dir, 'data.sh'), 'r') as f:
+        text = f.read()
+    variables = shell_variables(text, data_path)
+    source = {
+        "name": os.path.basename(os.path.normpath(source_dir)),
+        "endpoint": variables.get("AWS_ENDPOINT_URL", "http://localhost:4566"),
+        "region": variables.get("AWS_DEFAULT_REGION", "us-west-2"),
+        "credentials": (variables.get("AWS_ACCESS_KEY_ID", "test"), variables.get("AWS_SECRET_ACCESS_KEY", "test")),
+        "buckets": [],
+        "uploads": [],
+        "postgres": None,
+    }
+    for match in S3_COMMAND.finditer(text):
+        args = expand(match.group('args'), variables).split()
+        if match.group('op') == 'mb':
+            source["buckets"].append(args[0][len("s3://"):])
+        elif match.group('op') == 'cp':
+            local_path, target = args[0], args[1][len("s3://"):]
+            bucket, _, key = target.partition('/')
+            if not key or key.endswith('/'):
+                key += os.path.basename(local_path)
+            source["uploads"].append((local_path, bucket, key))
+    if re.search(r'^bash\s+\./postgres\.sh', text, re.M):
+        source["postgres"] = parse_postgres(os.path.join(source_dir, 'postgres.sh'), data_path)
+    return source
+
+
+def load_s3(source, upload_workers):
+    """Create the source's buckets and upload its files concurrently; returns bytes uploaded"""
+    if boto3 is None:
+        raise RuntimeError("boto3 is not installed; pip install boto3")
+    access_key, secret_key = source["credentials"]
+    s3 = boto3.client("s3", endpoint_url=source["endpoint"], region_name=source["region"],
+                      aws_access_key_id=access_key, aws_secret_access_key=secret_key)
+    for bucket in source["buckets"]:
+        try:
+            s3.create_bucket(Bucket=bucket, CreateBucketConfiguration={"LocationConstraint": source["region"]})
+        except s3.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+    def upload(item):
+        local_path, bucket, key = item
+        s3.upload_file(local_path, bucket, key)
+        return os.path.getsize(local_path)
+
+    with ThreadPoolExecutor(max_workers=upload_workers) as pool:
+        return sum(pool.map(upload, source["uploads"]))
+
+
+def load_postgres(postgres, table_workers):
+    """Run a postgres.sh's statements, then stream its COPYs concurrently over a connection pool.
+
+    Statements run in script order on one connection (psql -c autocommits each); the tables
+    have no foreign keys, so the COPYs only depend on their CREATE TABLE and may run in parallel.
+    Returns bytes copied.
+    """
+    if psycopg2 is None:
+        raise RuntimeError("psycopg2 is not installed; pip install psycopg2-binary")
+    connection = postgres["connection"]
+    maintenance = psycopg2.connect(dbname="postgres", **connection)
+    maintenance.autocommit = True
+    pool = None
+    try:
+        copies = []
+        for kind, database, statement, file_path in postgres["steps"]:
+            if kind == "copy":
+                copies.append((database, statement, file_path))
+                continue
+            if database is None:
+                conn = maintenance
+            else:
+                if pool is None:
+                    pool = ThreadedConnectionPool(1, max(table_workers, 1), dbname=database, **connection)
+                conn = pool.getconn()
+            try:
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(statement)
+            finally:
+                if conn is not maintenance:
+                    pool.putconn(conn)
+
+        def copy(item):
+            _, statement, file_path = item
+            conn = pool.getconn()
+            try:
+                conn.autocommit = True
+                with conn.cursor() as cursor, open(file_path, 'rb') as f:
+                    cursor.copy_expert(statement, f)
+            finally:
+                pool.putconn(conn)
+            return os.path.getsize(file_path)
+
+        if not copies:
+            return 0
+        if pool is None:
+            pool = ThreadedConnectionPool(1, max(table_workers, 1), dbname=copies[0][0], **connection)
+        with ThreadPoolExecutor(max_workers=table_workers) as executor:
+            return sum(executor.map(copy, copies))
+    finally:
+        if pool is not None:
+            pool.closeall()
+        maintenance.close()
+
+
+def provision(source_dir, data_path, table_workers, upload_workers):
+    """Provision one source; never raises, returns its timings"""
+    started = time.monotonic()
+    result = {"source": os.path.basename(source_dir), "s3_seconds": 0.0, "postgres_seconds": 0.0,
+              "objects": 0, "tables": 0, "bytes": 0, "error": None}
+    try:
+        source = parse_source(source_dir, data_path)
+        if source["uploads"] or source["buckets"]:
+            s3_started = time.monotonic()
+            result["bytes"] += load_s3(source, upload_workers)
+            result["objects"] = len(source["uploads"])
+            result["s3_seconds"] = time.monotonic() - s3_started
+        if source["postgres"]:
+            pg_started = time.monotonic()
+            result["bytes"] += load_postgres(source["postgres"], table_workers)
+            result["tables"] = sum(1 for step in source["postgres"]["steps"] if step[0] == "copy")
+            result["postgres_seconds"] = time.monotonic() - pg_started
+    except Exception as e:
+        print(traceback.format_exc(), flush=True)
+        result["error"] = str(e).splitlines()[0] if str(e) else type(e).__name__
+    result["seconds"] = time.monotonic() - started
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load every source's S3 objects and Postgres tables, as data_setup.sh did")
+    parser.add_argument("--path", type=str, default=".", help="Data path (the $1 of data.sh), holding data/<source>/")
+    parser.add_argument("--sources", type=str, default=None, help="Comma-separated sources to provision (default: all)")
+    parser.add_argument("--workers", type=int, default=8, help="Sources provisioned concurrently")
+    parser.add_argument("--table_workers", type=int, default=4, help="Concurrent COPYs (pooled connections) per source")
+    parser.add_argument("--upload_workers", type=int, default=8, help="Concurrent S3 uploads per source")
+    parser.add_argument("--report", type=str, default="./provision_report.json", help="Where per-source timings are written")
+    args = parser.parse_args()
+
+    names = sorted(os.listdir(SOURCES_DIR))
+    if args.sources:
+        names = [name for name in names if name in args.sources.split(",")]
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(provision, os.path.join(SOURCES_DIR, name), os.path.abspath(args.path),
+                               args.table_workers, args.upload_workers) for name in names]
+        results = []
+        for future in futures:
+            result = future.result()
+            results.append(result)
+            status = f"FAILED: {result['error']}" if result["error"] else "ok"
+            print(f"Databases Created: {result['source']} ({result['seconds']:.1f}s) {status}", flush=True)
+    elapsed = time.monotonic() - started
+
+    print(f"\n{'='*60}", flush=True)
+    print(f"  {'source':<32} {'objects':>7} {'tables':>6} {'MB':>9} {'s3 s':>7} {'pg s':>7} {'total':>7}", flush=True)
+    for r in sorted(results, key=lambda r: r["seconds"], reverse=True):
+        print(f"  {r['source']:<32} {r['objects']:>7} {r['tables']:>6} {r['bytes'] / 1e6:>9.1f} "
+              f"{r['s3_seconds']:>7.1f} {r['postgres_seconds']:>7.1f} {r['seconds']:>7.1f}", flush=True)
+    failed = [r for r in results if r["error"]]
+    print(f"Provisioned {len(results) - len(failed)}/{len(results)} sources in {elapsed:.1f}s", flush=True)
+    print(f"{'='*60}", flush=True)
+
+    with open(args.report, 'w') as f:
+        json.dump({"seconds": elapsed, "sources": results}, f, indent=2)
@@ -3,143 +3,258 @@ import json
 import os
 import shutil
 import csv
-import glob
+import io
+import argparse
+import hashlib
+import fcntl
+from concurrent.futures import ProcessPoolExecutor
 
-def uppercase_csv_files(directory):
+SOURCE_DIR = '../elt-bench'
+INPUTS_DIR = '../data/inputs'
+STAMP_DIR = '../data/cache/workspaces'
+CREDENTIAL_PATH = './destination/snowflake_credential.json'
+
+# FICLONE from linux/fs.h: share the source's extents (copy-on-write) instead of copying bytes
+FICLONE = 0x40049409
+
+
+def uppercase_csv(csv_file):
     """
-    Convert all CSV file names and their column names to uppercase
-    to avoid Snowflake case sensitivity issues.
+    Convert the column names listed in a schema CSV to uppercase
+    to avoid Snowflake case sensitivity issues. Returns the new file
+    content, or None if the file cannot be parsed (it is then kept as is).
     """
-    csv_files = glob.glob(os.path.join(directory, '**', '*.csv'), recursive=True)
-    
-    for csv_file in csv_files:
-        # Read the CSV file
-        try:
-            with open(csv_file, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                rows = list(reader)   
-            
-            if len(rows) > 0:
-                # Convert header (column names) to uppercase
-                rows[1:] = [[row[0].upper(), row[1]] for row in rows[1:]]
-              
-                # Write back to the same file
-                with open(csv_file, 'w', encoding='utf-8', newline='') as f:
-                    writer = csv.writer(f)
-                    writer.writerows(rows)
-                    
-        except Exception as e:
-            print(f"Error processing {csv_file}: {e}")
-        
-        # Rename file to uppercase
-        file_dir = os.path.dirname(csv_file)
-        file_name = os.path.basename(csv_file)
-        new_file_name = file_name.upper()
-        
-        if file_name != new_file_name:
-            new_file_path = os.path.join(file_dir, new_file_name)
-            try:
-                os.rename(csv_file, new_file_path)
-            except Exception as e:
-                print(f"Error renaming {csv_file}: {e}")
+    try:
+        with open(csv_file, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            rows = list(reader)
+
+        if len(rows) > 0:
+            # Convert header (column names) to uppercase
+            rows[1:] = [[row[0].upper(), row[1]] for row in rows[1:]]
+
+        out = io.StringIO(newline='')
+        writer = csv.writer(out)
+        writer.writerows(rows)
+        return out.getvalue()
+
+    except Exception as e:
+        print(f"Error processing {csv_file}: {e}")
+        return None
 
 
 def uppercase_data_model_yaml(yaml_file_path):
     """
     Convert all model names and column names in data_model.yaml to uppercase
-    to match Snowflake case conventions.
+    to match Snowflake case conventions. Returns the new file content.
     """
-    if not os.path.exists(yaml_file_path):
-        return
-    
     try:
         with open(yaml_file_path, 'r', encoding='utf-8') as f:
             data = yaml.safe_load(f)
-        
+
         if data and 'models' in data:
             for model in data['models']:
                 # Convert model name to uppercase
                 if 'name' in model:
                     model['name'] = model['name'].upper()
-                
+
                 # Convert column names to uppercase
                 if 'columns' in model:
                     for column in model['columns']:
                         if 'name' in column:
                             column['name'] = column['name'].upper()
-        
-        # Write back to file with proper encoding
-        with open(yaml_file_path, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, default_flow_style=False, sort_keys=False, allow_unicode=True, width=float('inf'))
-        
+
+        return yaml.dump(data, default_flow_style=False, sort_keys=False, allow_unicode=True, width=float('inf'))
+
     except Exception as e:
         print(f"Error processing {yaml_file_path}: {e}")
-        
-        
-def uppercase_config_yaml(yaml_file_path):
+        return None
+
+
+def write_config_yaml(yaml_file_path, snowflake_credential):
     """
-    Convert all model names and column names in data_model.yaml to uppercase
-    to match Snowflake case conventions.
+    Uppercase the snowflake database name in config.yaml and fill in the
+    account from the destination credentials. Returns the new file content.
+    """
+    with open(yaml_file_path, 'r', encoding='utf-8') as f:
+        data = yaml.safe_load(f)
+
+    if data and 'snowflake' in data:
+        if 'config' in data['snowflake'] and 'database' in data['snowflake']['config']:
+            data['snowflake']['config']['database'] = data['snowflake']['config']['database'].upper()
+
+    # Update Snowflake configuration only (Airbyte config removed - EL handled separately)
+    data['snowflake']['config']['account'] = snowflake_credential['account']
+    return yaml.dump(data)
+
+
+def link_or_copy(source, target, hardlink=False):
+    """Reflink `source` to `target` where the filesystem supports it, else hard-link (if allowed) or copy.
+
+    Hard links share the inode with elt-bench/, so an agent editing the workspace file in
+    place would change the original; they are only used when asked for.
     """
-    if not os.path.exists(yaml_file_path):
-        return
-      
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            return "reflink"
+        except OSError:
+            pass
+    if hardlink:
+        try:
+            os.remove(target)
+            os.link(source, target)
+            return "hardlink"
+        except OSError:
+            pass
+    shutil.copyfile(source, target)
+    return "copy"
+
+
+def source_files(db):
+    """Relative paths of every file of a problem in elt-bench/, sorted"""
+    root = os.path.join(SOURCE_DIR, db)
+    files = []
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            files.append(os.path.relpath(os.path.join(dir_path, file_name), root))
+    return sorted(files)
+
+
+def workspace_hash(db, snowflake_credential):
+    """Hash of everything a workspace is generated from: its elt-bench files, the credentials and this script"""
+    digest = hashlib.sha256()
+    with open(__file__, 'rb') as f:
+        digest.update(f.read())
+    digest.update(json.dumps(snowflake_credential, sort_keys=True).encode())
+    for rel_path in source_files(db):
+        digest.update(rel_path.encode() + b"\0")
+        with open(os.path.join(SOURCE_DIR, db, rel_path), 'rb') as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def materialize(db, snowflake_credential, hardlink=False):
+    """Build data/inputs/<db> in a temporary directory and swap it in.
+
+    Files whose content the transforms leave unchanged are linked to elt-bench/;
+    only rewritten files (and the injected credentials) are written.
+    Returns {"reflink"/"hardlink"/"copy"/"write": file count}.
+    """
+    target_dir = os.path.join(INPUTS_DIR, db)
+    tmp_dir = os.path.join(INPUTS_DIR, f".{db}.tmp")
+    if os.path.exists(tmp_dir):
+        shutil.rmtree(tmp_dir)
+
+    counts = {}
+    for rel_path in source_files(db):
+        source = os.path.join(SOURCE_DIR, db, rel_path)
+        content = None
+        if rel_path.endswith('.csv'):
+            content = uppercase_csv(source)
+            # Rename file to uppercase
+            rel_path = os.path.join(os.path.dirname(rel_path), os.path.basename(rel_path).upper())
+        elif rel_path == 'data_model.yaml':
+            content = uppercase_data_model_yaml(source)
+        elif rel_path == 'config.yaml':
+            content = write_config_yaml(source, snowflake_credential)
+
+        target = os.path.join(tmp_dir, rel_path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if content is not None:
+            data = content.encode('utf-8')
+            with open(source, 'rb') as f:
+                unchanged = f.read() == data
+            if not unchanged:
+                with open(target, 'wb') as f:
+                    f.write(data)
+                counts["write"] = counts.get("write", 0) + 1
+                continue
+        method = link_or_copy(source, target, hardlink)
+        counts[method] = counts.get(method, 0) + 1
+
+    new_sf_credentials = {}
+    new_sf_credentials['account'] = snowflake_credential['account']
+    new_sf_credentials['user'] = "AIRBYTE_USER"
+    new_sf_credentials['password'] = "Snowflake@123"
+
+    with open(os.path.join(tmp_dir, 'snowflake_credential.json'), 'w') as file:
+        json.dump(new_sf_credentials, file)
+    counts["write"] = counts.get("write", 0) + 1
+
+    # EL stage files removed - agents only handle transformation now
+    # Previously copied: documentation/, check_job_status.py, elt/main.tf
+
+    if os.path.exists(target_dir):
+        shutil.rmtree(target_dir)
+    os.rename(tmp_dir, target_dir)
+    return counts
+
+
+def workspace_manifest(db):
+    """{relative path: [size, mtime_ns]} of every file in data/inputs/<db>, or None if it is missing"""
+    root = os.path.join(INPUTS_DIR, db)
+    if not os.path.isdir(root):
+        return None
+    manifest = {}
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            stat = os.stat(os.path.join(dir_path, file_name))
+            manifest[os.path.relpath(os.path.join(dir_path, file_name), root)] = [stat.st_size, stat.st_mtime_ns]
+    return manifest
+
+
+def read_stamp(stamp_path):
     try:
-        with open(yaml_file_path, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
-        
-        if data and 'snowflake' in data:
-            if 'config' in data['snowflake'] and 'database' in data['snowflake']['config']:
-                data['snowflake']['config']['database'] = data['snowflake']['config']['database'].upper()
-              
-        # Write back to file with proper encoding
-        with open(yaml_file_path, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, default_flow_style=False, sort_keys=False, allow_unicode=True, width=float('inf'))
-        
-    except Exception as e:
-        print(f"Error processing {yaml_file_path}: {e}")
-        
-
-databases = [f.name for f in os.scandir('../elt-bench') if f.is_dir()]
-databases.sort()
-
-for db in databases:
-  os.makedirs('../data/inputs',exist_ok=True)
-  directory_path = f'../data/inputs/{db}'
-  if os.path.exists(directory_path) and os.path.isdir(directory_path):
-        shutil.rmtree(directory_path)
-  os.system(f"cp -r ../elt-bench/{db} ../data/inputs")
-  
-  # Convert CSV files and columns to uppercase
-  uppercase_csv_files(directory_path)
-  
-  # Convert data_model.yaml model and column names to uppercase
-  data_model_path = f'../data/inputs/{db}/data_model.yaml'
-  uppercase_data_model_yaml(data_model_path)
-  
-  # Convert config.yaml snowflake database name to uppercase
-  config_path = f'../data/inputs/{db}/config.yaml'
-  uppercase_config_yaml(config_path)
-  
-  with open(f'../data/inputs/{db}/config.yaml', 'r') as file:
-    config_data = yaml.safe_load(file)
-
-  with open('./destination/snowflake_credential.json', 'r') as file:
-    snowflake_credential = json.load(file)
-
-  # Update Snowflake configuration only (Airbyte config removed - EL handled separately)
-  config_data['snowflake']['config']['account'] = snowflake_credential['account']
-
-  with open(f'../data/inputs/{db}/config.yaml', 'w') as file:
-    yaml.dump(config_data, file)
-    
-  new_sf_credentials = {}
-  new_sf_credentials['account'] = snowflake_credential['account']
-  new_sf_credentials['user'] = "AIRBYTE_USER"
-  new_sf_credentials['password'] = "Snowflake@123"
-
-  with open(f'../data/inputs/{db}/snowflake_credential.json', 'w') as file:
-    json.dump(new_sf_credentials, file)
-
-  # EL stage files removed - agents only handle transformation now
-  # Previously copied: documentation/, check_job_status.py, elt/main.tf
\ No newline at end of file
+        with open(stamp_path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_workspace(db, snowflake_credential, force=False, hardlink=False):
+    """Materialize one workspace unless it is exactly what the last run generated; returns (db, counts or None).
+
+    The stamp records the inputs hash and a manifest of the generated files. Agents work in
+    data/inputs/, so a workspace whose files were added, removed or modified since is
+    regenerated even when its inputs are unchanged.
+    """
+    stamp_path = os.path.join(STAMP_DIR, f"{db}.json")
+    digest = workspace_hash(db, snowflake_credential)
+    stamp = read_stamp(stamp_path)
+    if not force and stamp and stamp.get("inputs") == digest and stamp.get("outputs") == workspace_manifest(db):
+        return db, None
+
+    counts = materialize(db, snowflake_credential, hardlink)
+    with open(f"{stamp_path}.tmp", 'w') as f:
+        json.dump({"inputs": digest, "outputs": workspace_manifest(db)}, f)
+    os.replace(f"{stamp_path}.tmp", stamp_path)
+    return db, counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate data/inputs/<problem> workspaces from elt-bench/")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Workspaces generated in parallel")
+    parser.add_argument("--force", action="store_true", help="Regenerate every workspace, even if its inputs and files are unchanged")
+    parser.add_argument("--hardlink", action="store_true", help="Hard-link unchanged files when the filesystem cannot reflink (agents must then not edit them in place)")
+    args = parser.parse_args()
+
+    databases = [f.name for f in os.scandir(SOURCE_DIR) if f.is_dir()]
+    databases.sort()
+
+    with open(CREDENTIAL_PATH, 'r') as file:
+        snowflake_credential = json.load(file)
+
+    os.makedirs(INPUTS_DIR, exist_ok=True)
+    os.makedirs(STAMP_DIR, exist_ok=True)
+
+    skipped = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = [pool.submit(write_workspace, db, snowflake_credential, args.force, args.hardlink) for db in databases]
+        for future in futures:
+            db, counts = future.result()
+            if counts is None:
+                skipped += 1
+            else:
+                print(f"{db}: " + ", ".join(f"{n} {method}" for method, n in sorted(counts.items())), flush=True)
+    print(f"Generated {len(databases) - skipped} workspaces, {skipped} unchanged", flush=True)
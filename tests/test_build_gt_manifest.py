@@ -0,0 +1,21 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'evaluation'))
+
+from build_gt_manifest import count_rows
+
+
+def test_count_rows_quoted_csv_with_embedded_newline(tmp_path):
+    path = tmp_path / "states.csv"
+    path.write_text('abbreviation,name\nAK,"Alas\nka"\nAL,Alabama\n')
+    assert count_rows(str(path)) == 2
+
+
+def test_count_rows_unquoted_csv_and_jsonl(tmp_path):
+    csv_path = tmp_path / "t.csv"
+    csv_path.write_text('a,b\n1,2\n3,4')
+    jsonl_path = tmp_path / "t.jsonl"
+    jsonl_path.write_text('{"a": 1}\n{"a": 2}\n{"a": 3}\n')
+    assert count_rows(str(csv_path)) == 2
+    assert count_rows(str(jsonl_path)) == 3
@@ -0,0 +1,77 @@
+import os
+import sys
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'dev', 'snowflake-connector'))
+
+from download_cache import DownloadCache
+
+
+class StaticHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def send_header(self, keyword, value):
+        if keyword != "Last-Modified" or not self.server.strip_validators:
+            super().send_header(keyword, value)
+
+    def end_headers(self):
+        # like Google Drive's uc?export=download responses
+        if self.server.attachment:
+            super().send_header("Content-Disposition", 'attachment; filename="data.csv"')
+        super().end_headers()
+
+
+@pytest.fixture
+def server(tmp_path):
+    root = tmp_path / "www"
+    root.mkdir()
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), partial(StaticHandler, directory=str(root)))
+    httpd.strip_validators = False
+    httpd.attachment = False
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd, root, f"http://127.0.0.1:{httpd.server_port}/data.csv"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_cached_while_unchanged(server, tmp_path):
+    httpd, root, url = server
+    (root / "data.csv").write_text("a\n1\n")
+    cache = DownloadCache(str(tmp_path / "cache"))
+    assert cache.fetch(url)[1] is False
+    assert cache.fetch(url)[1] is True
+
+
+def test_no_validators_is_never_served_stale(server, tmp_path):
+    httpd, root, url = server
+    httpd.strip_validators = True
+    (root / "data.csv").write_text("a\n1\n")
+    cache = DownloadCache(str(tmp_path / "cache"))
+    assert cache.fetch(url)[1] is False
+
+    (root / "data.csv").write_text("a\n2\n")
+    path, hit = cache.fetch(url)
+    assert hit is False
+    with open(path) as f:
+        assert f.read() == "a\n2\n"
+
+
+def test_drive_style_attachment_is_keyed_by_name_and_length(server, tmp_path):
+    httpd, root, url = server
+    httpd.strip_validators = True
+    httpd.attachment = True
+    (root / "data.csv").write_text("a\n1\n")
+    cache = DownloadCache(str(tmp_path / "cache"))
+    assert cache.fetch(url)[1] is False
+    assert cache.fetch(url)[1] is True
+
+    (root / "data.csv").write_text("a\n10\n")
+    path, hit = cache.fetch(url)
+    assert hit is False
+    with open(path) as f:
+        assert f.read() == "a\n10\n"
@@ -0,0 +1,78 @@
+import json
+import os
+import sys
+
+import pytest
+
+# eva_dbt counts model rows through snowflake.connector; the DuckDB emulator provides it offline
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'dev', 'snowflake-local'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'evaluation'))
+
+import snowflake.connector
+from eva_dbt import evaluate_stage1_artifacts
+
+RELATION = '"AMPLITUDE"."AIRBYTE_SCHEMA"."EVENT"'
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    """A one-database tree with a 3-row GT table, run from evaluation/ like eva.py"""
+    (tmp_path / "elt-bench" / "amplitude").mkdir(parents=True)
+    (tmp_path / "evaluation" / "amplitude").mkdir(parents=True)
+    (tmp_path / "evaluation" / "amplitude" / "event.sql").write_text("select * from event")
+    (tmp_path / "data" / "gt" / "amplitude").mkdir(parents=True)
+    (tmp_path / "data" / "gt" / "amplitude" / "event.csv").write_text("id\n1\n2\n3\n")
+    (tmp_path / "data" / "results" / "t").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path / "evaluation")
+    return tmp_path
+
+
+def write_dbt_run(run_dir, materialized, rows_affected):
+    target = run_dir / "out" / "amplitude" / "proj" / "target"
+    target.mkdir(parents=True)
+    result = {
+        "unique_id": "model.proj.event", "status": "success", "execution_time": 1.5, "timing": [],
+        "adapter_response": {"_message": f"SUCCESS {rows_affected}", "code": "SUCCESS", "rows_affected": rows_affected},
+    }
+    node = {"name": "event", "alias": "event", "config": {"materialized": materialized}, "relation_name": RELATION}
+    (target / "run_results.json").write_text(json.dumps({"results": [result]}))
+    (target / "manifest.json").write_text(json.dumps({"nodes": {"model.proj.event": node}}))
+
+
+def results_log(run_dir):
+    return (run_dir / "data" / "results" / "t" / "results.log").read_text()
+
+
+def build_table(root, rows):
+    conn = snowflake.connector.connect(root=str(root))
+    cursor = conn.cursor()
+    cursor.execute("create database if not exists AMPLITUDE")
+    cursor.execute("create schema if not exists AMPLITUDE.AIRBYTE_SCHEMA")
+    values = ", ".join(f"({i})" for i in range(rows))
+    cursor.execute(f"create or replace table {RELATION} as select * from (values {values}) t(id)")
+    conn.close()
+
+
+def test_ctas_rows_affected_is_not_a_row_count(run):
+    write_dbt_run(run, "table", 1)
+    evaluate_stage1_artifacts("t", "all", "../out")
+    log = results_log(run)
+    assert "Success: amplitude models built" in log
+    assert "amplitude.event row count not verified" in log
+
+
+@pytest.mark.parametrize("rows, ok", [(3, True), (2, False)])
+def test_ctas_model_is_counted_in_snowflake(run, rows, ok):
+    build_table(run / "snowflake", rows)
+    write_dbt_run(run, "table", 1)
+    evaluate_stage1_artifacts("t", "all", "../out", {"root": str(run / "snowflake")})
+    log = results_log(run)
+    assert ("Success: amplitude models built" in log) == ok
+    assert ("amplitude.event has 2 rows, expected 3 rows" in log) == (not ok)
+
+
+@pytest.mark.parametrize("rows_affected, ok", [(3, True), (2, False)])
+def test_incremental_rows_affected_is_compared(run, rows_affected, ok):
+    write_dbt_run(run, "incremental", rows_affected)
+    evaluate_stage1_artifacts("t", "all", "../out")
+    assert ("Success: amplitude models built" in results_log(run)) == ok
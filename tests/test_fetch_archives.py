@@ -0,0 +1,25 @@
+import os
+import sys
+import zipfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'setup'))
+
+from fetch_archives import extract, file_sha256
+
+
+def write_zip(path, members):
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return str(path)
+
+
+def test_republished_archive_rewrites_same_size_changes(tmp_path):
+    dest = tmp_path / "source"
+    first = write_zip(tmp_path / "v1.zip", {"db/orders.csv": "id\n1\n", "db/users.csv": "id\n7\n"})
+    assert extract(first, str(dest), file_sha256(first), 2) == (2, 0)
+    assert extract(first, str(dest), file_sha256(first), 2) is None
+
+    second = write_zip(tmp_path / "v2.zip", {"db/orders.csv": "id\n2\n", "db/users.csv": "id\n7\n"})
+    assert extract(second, str(dest), file_sha256(second), 2) == (1, 1)
+    assert (dest / "db" / "orders.csv").read_text() == "id\n2\n"
@@ -0,0 +1,20 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'dev', 'snowflake-connector'))
+
+from file_splitter import split_file
+
+
+def test_split_file_resplits_when_the_chunk_size_changes(tmp_path):
+    source = tmp_path / "orders.jsonl"
+    source.write_bytes(b"".join(os.urandom(256).hex().encode() + b"\n" for _ in range(200)))
+
+    out_dir = split_file(source, tmp_path / "chunks", 4096)
+    small_chunks = sorted(out_dir.glob("*.gz"))
+    assert len(small_chunks) > 1
+    assert split_file(source, tmp_path / "chunks", 4096) == out_dir
+    assert sorted(out_dir.glob("*.gz")) == small_chunks
+
+    split_file(source, tmp_path / "chunks", 1 << 20)
+    assert len(list(out_dir.glob("*.gz"))) == 1
@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'dev', 'snowflake-connector'))
+
+from golden import DatabaseResetter
+
+
+class Recorder:
+    """Stand-in for the Snowflake connection: records every statement, answers SHOW DATABASES from `databases`"""
+
+    def __init__(self, databases=()):
+        self.databases = list(databases)
+        self.statements = []
+
+    def __call__(self, sql):
+        self.statements.append(sql)
+        if sql.startswith("SHOW DATABASES"):
+            return [(None, name, "N", "N") for name in self.databases]
+        return []
+
+
+def test_promote_clones_the_working_database():
+    recorder = Recorder()
+    DatabaseResetter(recorder).promote("ADDRESS")
+    assert recorder.statements == ["CREATE OR REPLACE DATABASE ADDRESS_GOLDEN CLONE ADDRESS"]
+
+
+def test_reset_clones_the_golden_copy_over_the_working_database():
+    recorder = Recorder(["ADDRESS_GOLDEN"])
+    DatabaseResetter(recorder).reset("ADDRESS")
+    assert recorder.statements == [
+        "SHOW DATABASES LIKE 'ADDRESS_GOLDEN'",
+        "CREATE OR REPLACE DATABASE ADDRESS CLONE ADDRESS_GOLDEN",
+    ]
+
+
+def test_reset_without_golden_copy_changes_nothing():
+    recorder = Recorder()
+    with pytest.raises(RuntimeError, match="No golden copy ADDRESS_GOLDEN"):
+        DatabaseResetter(recorder).reset("ADDRESS")
+    assert recorder.statements == ["SHOW DATABASES LIKE 'ADDRESS_GOLDEN'"]
+
+
+def test_like_wildcard_match_is_not_a_golden_copy():
+    # Snowflake's LIKE returns MOVIE_3XGOLDEN for 'MOVIE_3_GOLDEN'
+    recorder = Recorder(["MOVIE_3XGOLDEN"])
+    resetter = DatabaseResetter(recorder)
+    assert not resetter.has_golden("movie_3")
+    with pytest.raises(RuntimeError):
+        resetter.reset("movie_3")
+    assert not any(sql.startswith("CREATE") for sql in recorder.statements)
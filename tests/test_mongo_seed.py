@@ -0,0 +1,50 @@
+import json
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'setup'))
+
+from mongo import seed, seed_collection
+
+CSV = "id,score,name,ratio\n1,10,Ann,0.5\n2,20,Bob,1.5\n3,30,,2.5\n4,,Di,3.5\n5,50,Ed,4.5\n"
+
+
+def stored(collection):
+    return list(collection.find({}, {'_id': 0}).sort('id', 1))
+
+
+@pytest.mark.parametrize("batch_size", [2, 100])
+def test_documents_match_a_whole_file_read(tmp_path, batch_size):
+    path = tmp_path / "users.csv"
+    path.write_text(CSV)
+    collection = mongomock.MongoClient()['db']['users']
+
+    assert seed_collection(collection, str(path), batch_size) == 5
+
+    expected = [{k: v for k, v in row.items() if not pd.isna(v)} for row in pd.read_csv(path).to_dict(orient='records')]
+    docs = stored(collection)
+    assert docs == expected
+    # nulls are left out instead of stored
+    assert 'name' not in docs[2] and 'score' not in docs[3]
+    # score has a null in the last batches, so a whole-file read and every document have it as a float
+    assert all(type(doc['score']) is float for doc in docs if 'score' in doc)
+    assert all(type(doc['id']) is int for doc in docs)
+
+
+def test_seed_drops_and_reseeds_every_listed_collection(tmp_path):
+    (tmp_path / "data" / "shop").mkdir(parents=True)
+    (tmp_path / "data" / "shop" / "users.csv").write_text(CSV)
+    (tmp_path / "data" / "shop" / "orders.csv").write_text("id,user_id\n1,1\n2,1\n")
+    client = mongomock.MongoClient()
+    client['shop']['stale'].insert_one({'x': 1})
+
+    seed(client, json.loads('{"shop": ["users", "orders"]}'), str(tmp_path), batch_size=2, workers=2)
+
+    assert sorted(client['shop'].list_collection_names()) == ['orders', 'users']
+    assert client['shop']['users'].count_documents({}) == 5
+    assert stored(client['shop']['orders']) == [{'id': 1, 'user_id': 1}, {'id': 2, 'user_id': 1}]
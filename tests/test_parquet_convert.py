@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'dev', 'snowflake-connector'))
+
+import parquet_convert
+from parquet_convert import convert_file, read_csv
+
+
+def null_counts(table):
+    return {name: table.column(name).null_count for name in table.column_names}
+
+
+def test_csv_and_parquet_loads_have_the_same_null_counts(tmp_path):
+    csv_path = tmp_path / "customers.csv"
+    # empty unquoted fields are NULL, a quoted "" stays an empty string
+    csv_path.write_text('id,name,city,age\n1,Ann,,30\n2,,"",\n3,"Bo\nb",Austin,41\n')
+
+    csv_table = read_csv(csv_path)
+    parquet_table = pq.read_table(convert_file(csv_path, tmp_path))
+
+    assert null_counts(csv_table) == {"id": 0, "name": 1, "city": 1, "age": 1}
+    assert null_counts(parquet_table) == null_counts(csv_table)
+    assert parquet_table.column("city").to_pylist() == [None, "", "Austin"]
+
+
+def test_streamed_csv_widens_types_that_change_after_the_first_block(tmp_path, monkeypatch):
+    monkeypatch.setattr(parquet_convert, "BLOCK_BYTES", 64)
+    csv_path = tmp_path / "events.csv"
+    csv_path.write_text("id,amount,code\n" + "".join(f"{i},{i},{i}\n" for i in range(50)) + "50,2.5,A1\n")
+
+    parquet_table = pq.read_table(convert_file(csv_path, tmp_path))
+
+    assert parquet_table.num_rows == 51
+    assert parquet_table.schema.field("id").type == pa.int64()
+    assert parquet_table.schema.field("amount").type == pa.float64()
+    assert parquet_table.schema.field("code").type == pa.string()
+    assert parquet_table.column("code").to_pylist()[-2:] == ["49", "A1"]
+
+
+def test_streamed_jsonl_matches_a_full_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(parquet_convert, "BLOCK_BYTES", 64)
+    jsonl_path = tmp_path / "users.jsonl"
+    jsonl_path.write_text("".join(f'{{"id": {i}, "name": "u{i}"}}\n' for i in range(40)))
+
+    parquet_table = pq.read_table(convert_file(jsonl_path, tmp_path))
+
+    assert parquet_table.num_rows == 40
+    assert parquet_table.column("name").to_pylist()[-1] == "u39"
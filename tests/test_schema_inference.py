@@ -0,0 +1,77 @@
+import os
+import sys
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'dev', 'snowflake-connector'))
+
+from schema_inference import infer_columns, snowflake_type
+
+
+@pytest.mark.parametrize("arrow_type, expected", [
+    (pa.bool_(), "BOOLEAN"),
+    (pa.int8(), "NUMBER(38, 0)"),
+    (pa.int64(), "NUMBER(38, 0)"),
+    (pa.uint64(), "NUMBER(38, 0)"),
+    (pa.float32(), "FLOAT"),
+    (pa.float64(), "FLOAT"),
+    (pa.decimal128(12, 2), "NUMBER(12, 2)"),
+    (pa.date32(), "DATE"),
+    (pa.time64("us"), "TIME"),
+    (pa.timestamp("s"), "TIMESTAMP_NTZ"),
+    (pa.timestamp("us", tz="UTC"), "TIMESTAMP_TZ"),
+    (pa.string(), "TEXT"),
+    (pa.large_string(), "TEXT"),
+    (pa.binary(), "BINARY"),
+    (pa.list_(pa.int64()), "ARRAY"),
+    (pa.struct([("a", pa.int64())]), "OBJECT"),
+    (pa.null(), "TEXT"),
+])
+def test_snowflake_type(arrow_type, expected):
+    assert snowflake_type(arrow_type) == expected
+
+
+CSV = (
+    "id,price,active,day,seen_at,name,empty,big,mixed\n"
+    "1,1.5,true,2024-01-02,2024-01-02 03:04:05,Ann,,1,1\n"
+    "2,2,false,2024-01-03,2024-01-03 03:04:05,Bob,,2,2\n"
+    "3,3.25,true,2024-01-04,2024-01-04 03:04:05,Cy,,12345678901234,2.5\n"
+    "4,4,false,2024-01-05,2024-01-05 03:04:05,Di,,4,four\n"
+)
+
+
+def test_infer_csv_columns(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text(CSV)
+    assert infer_columns(path) == [
+        ("id", "NUMBER(38, 0)", True),
+        ("price", "FLOAT", True),
+        ("active", "BOOLEAN", True),
+        ("day", "DATE", True),
+        ("seen_at", "TIMESTAMP_NTZ", True),
+        ("name", "TEXT", True),
+        # null-only
+        ("empty", "TEXT", True),
+        # widened: small ints then a 14-digit one, ints then a float, then text
+        ("big", "NUMBER(38, 0)", True),
+        ("mixed", "TEXT", True),
+    ]
+
+
+def test_sample_sees_only_its_rows(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text("id,code\n" + "".join(f"{i},{i}\n" for i in range(100)) + "100,A1\n")
+    assert infer_columns(path)[1] == ("code", "TEXT", True)
+    assert infer_columns(path, sample_bytes=64)[1] == ("code", "NUMBER(38, 0)", True)
+
+
+def test_infer_jsonl_and_parquet_columns(tmp_path):
+    jsonl_path = tmp_path / "users.jsonl"
+    jsonl_path.write_text('{"id": 1, "score": 1, "tags": ["a"]}\n{"id": 2, "score": 2.5, "tags": []}\n')
+    assert infer_columns(jsonl_path) == [("id", "NUMBER(38, 0)", True), ("score", "FLOAT", True), ("tags", "ARRAY", True)]
+
+    parquet_path = tmp_path / "users.parquet"
+    pq.write_table(pa.table({"id": pa.array([1], pa.int32()), "amount": pa.array([1], pa.decimal128(10, 3))}), parquet_path)
+    assert infer_columns(parquet_path) == [("id", "NUMBER(38, 0)", True), ("amount", "NUMBER(10, 3)", True)]
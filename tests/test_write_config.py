@@ -0,0 +1,42 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'setup'))
+
+import write_config
+
+CREDENTIAL = {"account": "xy12345"}
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    source = tmp_path / "elt-bench" / "address"
+    source.mkdir(parents=True)
+    (source / "config.yaml").write_text("snowflake:\n  config:\n    database: address\n")
+    (source / "states.csv").write_text("column,type\nname,VARCHAR\n")
+    (tmp_path / "stamps").mkdir()
+    monkeypatch.setattr(write_config, "SOURCE_DIR", str(tmp_path / "elt-bench"))
+    monkeypatch.setattr(write_config, "INPUTS_DIR", str(tmp_path / "inputs"))
+    monkeypatch.setattr(write_config, "STAMP_DIR", str(tmp_path / "stamps"))
+    return tmp_path / "inputs" / "address"
+
+
+def test_unchanged_workspace_is_skipped(dirs):
+    assert write_config.write_workspace("address", CREDENTIAL)[1] is not None
+    assert write_config.write_workspace("address", CREDENTIAL)[1] is None
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda ws: (ws / "STATES.CSV").write_text("edited by an agent\n"),
+    lambda ws: (ws / "models").mkdir() or (ws / "models" / "states.sql").write_text("select 1"),
+    lambda ws: os.remove(ws / "config.yaml"),
+])
+def test_workspace_modified_after_generation_is_regenerated(dirs, mutate):
+    write_config.write_workspace("address", CREDENTIAL)
+    generated = sorted(p.name for p in dirs.rglob("*"))
+    mutate(dirs)
+    assert write_config.write_workspace("address", CREDENTIAL)[1] is not None
+    assert sorted(p.name for p in dirs.rglob("*")) == generated
+    assert (dirs / "STATES.CSV").read_text() == "column,type\nNAME,VARCHAR\n"